@@ -0,0 +1,361 @@
+"""Run and time the solvers of every day.
+
+Each `day-N/solver.py` is expected to expose `parse_input`, `solve_part_one`
+and `solve_part_two`. Days without a `parse_input` (e.g., day 1) get the input
+lines passed straight to their solvers.
+
+Usage:
+    python aoc.py                       # all days, both parts, input.txt
+    python aoc.py 3 5 --part 2          # only part two of days 3 and 5
+    python aoc.py 8 --input example1.txt --json
+    python aoc.py --parallel --input example1.txt --input input.txt
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+import importlib.util
+from pathlib import Path
+from types import ModuleType
+from typing import Callable
+from dataclasses import dataclass, asdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+
+ROOT_DIR = Path(__file__).parent
+
+DEFAULT_INPUT_NAME = "input.txt"
+
+PART_FUNCTION_NAMES = {
+    1: "solve_part_one",
+    2: "solve_part_two",
+}
+
+
+@dataclass
+class PhaseStats:
+    """Resources used by a single phase (read, parse, or solve)."""
+    wall_time: float            # seconds
+    cpu_time: float             # seconds
+    peak_memory: int | None     # bytes allocated at peak, None if not traced
+
+
+@dataclass
+class Solver:
+    day: int
+    module: ModuleType
+
+    @property
+    def parse_input(self) -> Callable:
+        return getattr(self.module, "parse_input", lambda input_lines: input_lines)
+
+    def solve_part(self, part: int) -> Callable:
+        return getattr(self.module, PART_FUNCTION_NAMES[part])
+
+
+def find_days() -> list[int]:
+    """Return the sorted list of days that have a solver."""
+    return sorted(
+        int(path.parent.name.removeprefix("day-"))
+        for path in ROOT_DIR.glob("day-*/solver.py")
+    )
+
+
+def get_day_dir(day: int) -> Path:
+    return ROOT_DIR / f"day-{day}"
+
+
+def load_solver(day: int) -> Solver:
+    """Import `day-N/solver.py` as module `day_N_solver`."""
+    module_name = f"day_{day}_solver"
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, get_day_dir(day) / "solver.py")
+        module = importlib.util.module_from_spec(spec)
+
+        # Registered before executing so that dataclasses and pickle can find it
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+
+    return Solver(day=day, module=sys.modules[module_name])
+
+
+def load_solvers(days: list[int]):
+    for day in days:
+        load_solver(day)
+
+
+def resolve_input_path(day: int, input_name: str = DEFAULT_INPUT_NAME) -> Path:
+    """Inputs given by name are looked up inside the day's directory."""
+    input_path = Path(input_name)
+    if input_path.is_absolute() or len(input_path.parts) > 1:
+        return input_path
+    return get_day_dir(day) / input_path
+
+
+def read_input(input_path: Path) -> list[str]:
+    return [line.strip() for line in input_path.read_text().splitlines()]
+
+
+def measure(func: Callable, *args, trace_memory: bool = True) -> tuple[object, PhaseStats]:
+    """Call `func(*args)` and return its output together with the resources used.
+
+    NOTE: tracing memory allocations slows down the measured function, so
+    timings taken with `trace_memory=True` are pessimistic.
+    """
+    if trace_memory:
+        tracemalloc.start()
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    output = func(*args)
+    wall_time = time.perf_counter() - wall_start
+    cpu_time = time.process_time() - cpu_start
+
+    peak_memory = None
+    if trace_memory:
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return output, PhaseStats(wall_time=wall_time, cpu_time=cpu_time, peak_memory=peak_memory)
+
+
+def parse_day(
+        day: int,
+        input_name: str = DEFAULT_INPUT_NAME,
+        trace_memory: bool = True,
+    ) -> tuple[dict, object]:
+    """Read and parse the input of a day, timing each phase.
+
+    Returns
+    -------
+    report, problem_data : tuple[dict, object]
+        A JSON-serializable report with the `PhaseStats` of each phase (and an
+        empty "parts" dict to be filled by `solve_day_part`), and the parsed
+        input.
+    """
+    solver = load_solver(day)
+    input_path = resolve_input_path(day, input_name)
+
+    input_lines, read_stats = measure(read_input, input_path, trace_memory=trace_memory)
+    problem_data, parse_stats = measure(solver.parse_input, input_lines, trace_memory=trace_memory)
+
+    report = {
+        "day": day,
+        "input": str(input_path),
+        "read": asdict(read_stats),
+        "parse": asdict(parse_stats),
+        "parts": {},
+    }
+    return report, problem_data
+
+
+def solve_day_part(day: int, part: int, problem_data, trace_memory: bool = True) -> dict:
+    """Solve one part of a day on already parsed data, timing it."""
+    solver = load_solver(day)
+    answer, solve_stats = measure(solver.solve_part(part), problem_data, trace_memory=trace_memory)
+    return {"answer": answer, **asdict(solve_stats)}
+
+
+def run_day(
+        day: int,
+        parts: tuple[int, ...] = (1, 2),
+        input_name: str = DEFAULT_INPUT_NAME,
+        trace_memory: bool = True,
+    ) -> dict:
+    """Read, parse, and solve the given parts of a day, timing each phase.
+
+    Returns
+    -------
+    report : dict
+        A JSON-serializable dict with the answer to each part and the
+        `PhaseStats` of each phase.
+    """
+    report, problem_data = parse_day(day, input_name=input_name, trace_memory=trace_memory)
+
+    for part in parts:
+        report["parts"][str(part)] = solve_day_part(day, part, problem_data, trace_memory=trace_memory)
+
+    return report
+
+
+def run_batch(
+        day_inputs: list[tuple[int, str]],
+        parts: tuple[int, ...] = (1, 2),
+        trace_memory: bool = True,
+        max_workers: int | None = None,
+    ) -> list[dict]:
+    """Run every (day, input) pair on a pool of worker processes.
+
+    Each input is parsed once, by a single job; as soon as it's parsed, one
+    job per part is scheduled on the parsed data. Jobs of different days run
+    concurrently, so the total wall time approaches that of the slowest
+    parse + solve chain rather than the sum of all jobs.
+
+    Parameters
+    ----------
+    day_inputs : list[tuple[int, str]]
+        The (day, input name) pairs to run.
+    parts : tuple[int, ...], optional
+        The parts to solve for each pair, by default both.
+    trace_memory : bool, optional
+        Whether to trace peak memory in each job, by default True.
+    max_workers : int, optional
+        The number of worker processes, by default the number of CPUs.
+
+    Returns
+    -------
+    reports : list[dict]
+        One report per (day, input) pair, in the given order (see `run_day`).
+    """
+    # Parsed data is pickled between processes, so every process must have
+    # imported the solver modules that define its classes
+    days = sorted({day for day, _ in day_inputs})
+    load_solvers(days)
+
+    reports = [None] * len(day_inputs)
+    with ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count(),
+        initializer=load_solvers,
+        initargs=(days,),
+    ) as executor:
+        pending = {
+            executor.submit(parse_day, day, input_name, trace_memory): (idx, None)
+            for idx, (day, input_name) in enumerate(day_inputs)
+        }
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx, part = pending.pop(future)
+                day, _ = day_inputs[idx]
+
+                # A parse job finished: schedule its solve jobs
+                if part is None:
+                    reports[idx], problem_data = future.result()
+                    pending.update({
+                        executor.submit(solve_day_part, day, part, problem_data, trace_memory): (idx, part)
+                        for part in parts
+                    })
+
+                # A solve job finished
+                else:
+                    reports[idx]["parts"][str(part)] = future.result()
+
+    # Keep the parts in order regardless of which finished first
+    for report in reports:
+        report["parts"] = {str(part): report["parts"][str(part)] for part in parts}
+
+    return reports
+
+
+def format_report_table(reports: list[dict]) -> str:
+    """Format the given day reports as a human-readable table."""
+
+    def format_row(day, input_name, phase, answer, stats) -> str:
+        peak_memory = stats["peak_memory"]
+        return (
+            f"{day:>4} {input_name:<16} {phase:<8} {str(answer):>20} "
+            f"{stats['wall_time'] * 1e3:>12.3f} {stats['cpu_time'] * 1e3:>12.3f} "
+            f"{'-' if peak_memory is None else f'{peak_memory / 1024:.1f}':>12}"
+        )
+
+    lines = [
+        f"{'day':>4} {'input':<16} {'phase':<8} {'answer':>20} "
+        f"{'wall (ms)':>12} {'cpu (ms)':>12} {'peak (KiB)':>12}",
+    ]
+    for report in reports:
+        day, input_name = report["day"], Path(report["input"]).name
+        lines.append(format_row(day, input_name, "read", "", report["read"]))
+        lines.append(format_row(day, input_name, "parse", "", report["parse"]))
+        for part, part_report in report["parts"].items():
+            lines.append(format_row(day, input_name, f"part {part}", part_report["answer"], part_report))
+
+    return "\n".join(lines)
+
+
+def get_environment_info() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "days", nargs="*", type=int,
+        help="Days to run (default: all days with a solver).",
+    )
+    parser.add_argument(
+        "--part", type=int, choices=sorted(PART_FUNCTION_NAMES), action="append", dest="parts",
+        help="Part to solve; may be given twice (default: both parts).",
+    )
+    parser.add_argument(
+        "--input", action="append", dest="input_names",
+        help="Input file name inside each day's directory, or a path to a file; "
+             f"may be given several times (default: {DEFAULT_INPUT_NAME}).",
+    )
+    parser.add_argument(
+        "--json", action="store_true",
+        help="Write a machine-readable JSON report to stdout.",
+    )
+    parser.add_argument(
+        "--no-memory", action="store_false", dest="trace_memory",
+        help="Don't trace peak memory (tracing slows down the solvers).",
+    )
+    parser.add_argument(
+        "--parallel", action="store_true",
+        help="Run all days, parts, and inputs concurrently on a pool of processes.",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=None,
+        help="Number of worker processes for --parallel (default: number of CPUs).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    days = args.days or find_days()
+    parts = tuple(sorted(set(args.parts or PART_FUNCTION_NAMES)))
+
+    day_inputs = []
+    for day in days:
+        for input_name in args.input_names or [DEFAULT_INPUT_NAME]:
+            if not resolve_input_path(day, input_name).exists():
+                print(f"Skipping day {day}: input '{input_name}' not found.", file=sys.stderr)
+                continue
+            day_inputs.append((day, input_name))
+
+    wall_start = time.perf_counter()
+    if args.parallel:
+        reports = run_batch(day_inputs, parts=parts, trace_memory=args.trace_memory, max_workers=args.jobs)
+    else:
+        reports = [
+            run_day(day, parts=parts, input_name=input_name, trace_memory=args.trace_memory)
+            for day, input_name in day_inputs
+        ]
+    total_wall_time = time.perf_counter() - wall_start
+
+    # Write to stdout
+    if args.json:
+        print(json.dumps(
+            {
+                "environment": get_environment_info(),
+                "total_wall_time": total_wall_time,
+                "results": reports,
+            },
+            indent=2,
+            default=str,
+        ))
+    else:
+        print(format_report_table(reports))
+        print(f"\nTotal wall time: {total_wall_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,627 @@
+"""Benchmark the solvers of every day on synthetic inputs of increasing size.
+
+For each day, a seeded generator creates a valid puzzle input at each scale
+(1x is roughly the size of the shipped `input.txt`). Every (day, part, scale)
+run happens in a fresh `aoc.py` process, so solvers can't share state between
+runs and runaway solvers can be killed. Once a part exceeds the time limit,
+or has no answer (it isn't solved yet), larger scales are skipped for that
+part; once a day's input would exceed the size limit, larger scales are
+skipped for the whole day.
+
+The empirical complexity of each phase is the slope of a least-squares fit of
+log(time) on log(scale); phases growing faster than their expected complexity
+class are flagged.
+
+Usage:
+    python benchmark.py                                 # all days, all scales
+    python benchmark.py 3 10 --scales 1 10 100 --save baseline.json
+    python benchmark.py --compare baseline.json
+"""
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Callable
+
+from aoc import find_days, get_environment_info
+
+
+ROOT_DIR = Path(__file__).parent
+
+DEFAULT_SCALES = [1, 10, 100, 1_000, 10_000]
+
+DEFAULT_SEED = 2023
+
+# Runs faster than this are mostly noise and are not used for fitting
+MIN_FIT_TIME = 1e-3
+
+# Inputs are not generated beyond this size (MiB), extrapolated from the
+# previous scale, as generators build them in memory
+DEFAULT_MAX_INPUT_SIZE = 256
+
+# Exponent of each complexity class on a log-log plot
+COMPLEXITY_CLASS_EXPONENTS = {
+    "1": 0.0,
+    "n": 1.0,
+    "n log n": 1.0,
+    "n^2": 2.0,
+}
+
+# Slack allowed over the expected exponent before flagging a phase
+EXPONENT_TOLERANCE = 0.3
+
+# Complexity class each phase should have, as a function of the input size
+EXPECTED_COMPLEXITY = {
+    1: {"parse": "n", "1": "n", "2": "n"},
+    2: {"parse": "n", "1": "n", "2": "n"},
+    3: {"parse": "n", "1": "n", "2": "n"},
+    4: {"parse": "n", "1": "n", "2": "n"},
+    5: {"parse": "n log n", "1": "n log n", "2": "n log n"},
+    6: {"parse": "n", "1": "n", "2": "n"},
+    7: {"parse": "n", "1": "n log n", "2": "n log n"},
+    8: {"parse": "n", "1": "n", "2": "n"},
+    9: {"parse": "n", "1": "n", "2": "n"},
+    10: {"parse": "n", "1": "n", "2": "n"},
+    11: {"parse": "n", "1": "n", "2": "n"},
+}
+
+
+### Input generators
+def generate_day_1(scale: int, rng: random.Random) -> str:
+    spelled_digits = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
+    letters = "abcdefghijklmnopqrstuvwxyz"
+
+    def random_token() -> str:
+        token_type = rng.random()
+        if token_type < 0.15:
+            return rng.choice("123456789")
+        elif token_type < 0.3:
+            return rng.choice(spelled_digits)
+        return rng.choice(letters)
+
+    lines = []
+    for _ in range(1000 * scale):
+        tokens = [random_token() for _ in range(rng.randint(2, 15))]
+
+        # Part one needs at least one digit character per line
+        tokens.insert(rng.randrange(len(tokens) + 1), rng.choice("123456789"))
+        lines.append("".join(tokens))
+
+    return "\n".join(lines) + "\n"
+
+
+def generate_day_2(scale: int, rng: random.Random) -> str:
+    colors = ["red", "green", "blue"]
+
+    lines = []
+    for game_id in range(1, 100 * scale + 1):
+        game_sets = [
+            ", ".join(
+                f"{rng.randint(1, 20)} {color}"
+                for color in rng.sample(colors, rng.randint(1, len(colors)))
+            )
+            for _ in range(rng.randint(1, 6))
+        ]
+        lines.append(f"Game {game_id}: " + "; ".join(game_sets))
+
+    return "\n".join(lines) + "\n"
+
+
+def generate_day_3(scale: int, rng: random.Random) -> str:
+    width = 140
+    symbols = "*#+$/@%=&-"
+
+    lines = []
+    for _ in range(140 * scale):
+        row = []
+        while len(row) < width:
+            tile_type = rng.random()
+            if tile_type < 0.12:
+                number = str(rng.randint(1, 999))
+                row.extend(number)
+                row.append(".")        # numbers must not touch each other on the same row
+            elif tile_type < 0.18:
+                row.append(rng.choice(symbols))
+            else:
+                row.append(".")
+        lines.append("".join(row[:width]).rstrip("0123456789").ljust(width, "."))
+
+    return "\n".join(lines) + "\n"
+
+
+def generate_day_4(scale: int, rng: random.Random) -> str:
+    num_cards = 200 * scale
+    num_winners, num_have = 10, 25
+
+    lines = []
+    for card_idx in range(num_cards):
+
+        # Mostly cards without matches, so the number of copies stays bounded
+        num_matches = 0 if rng.random() < 0.85 else rng.randint(1, num_winners)
+        num_matches = min(num_matches, num_cards - card_idx - 1)
+
+        numbers = rng.sample(range(1, 100), num_winners + num_have - num_matches)
+        winners = numbers[:num_winners]
+        have = winners[:num_matches] + numbers[num_winners:]
+        rng.shuffle(have)
+
+        lines.append(
+            f"Card {card_idx + 1:>4}: "
+            + " ".join(f"{n:>2}" for n in winners)
+            + " | "
+            + " ".join(f"{n:>2}" for n in have)
+        )
+
+    return "\n".join(lines) + "\n"
+
+
+def generate_day_5(scale: int, rng: random.Random) -> str:
+    max_value = 2 ** 32
+    num_seed_ranges = 10 * scale
+    num_mappings = 30 * scale
+
+    seeds = []
+    for _ in range(num_seed_ranges):
+        length = rng.randint(1, max_value // (2 * num_seed_ranges))
+        seeds.extend((rng.randrange(max_value - length), length))
+
+    map_names = [
+        "seed", "soil", "fertilizer", "water", "light", "temperature", "humidity", "location",
+    ]
+    sections = ["seeds: " + " ".join(map(str, seeds))]
+    for src_name, dst_name in zip(map_names, map_names[1:]):
+
+        # Split the value space into disjoint source ranges, and lay them out
+        # in a shuffled order to get (disjoint) destination ranges
+        breakpoints = sorted(rng.sample(range(max_value), num_mappings + 1))
+        src_ranges = list(zip(breakpoints, breakpoints[1:]))
+        dst_order = list(range(num_mappings))
+        rng.shuffle(dst_order)
+
+        map_lines = []
+        dst_start = breakpoints[0]
+        for idx in dst_order:
+            src_start, src_end = src_ranges[idx]
+            map_lines.append(f"{dst_start} {src_start} {src_end - src_start}")
+            dst_start += src_end - src_start
+
+        rng.shuffle(map_lines)
+        sections.append(f"{src_name}-to-{dst_name} map:\n" + "\n".join(map_lines))
+
+    return "\n\n".join(sections) + "\n"
+
+
+def generate_day_6(scale: int, rng: random.Random) -> str:
+    times = [rng.randint(40, 99) for _ in range(4 * scale)]
+    distances = [rng.randint(1, t * t // 4 - 1) for t in times]
+    return (
+        "Time:      " + " ".join(f"{t:>4}" for t in times) + "\n"
+        + "Distance:  " + " ".join(f"{d:>4}" for d in distances) + "\n"
+    )
+
+
+def generate_day_7(scale: int, rng: random.Random) -> str:
+    return "".join(
+        f"{''.join(rng.choices('23456789TJQKA', k=5))} {rng.randint(1, 1000)}\n"
+        for _ in range(1000 * scale)
+    )
+
+
+def generate_day_8(scale: int, rng: random.Random) -> str:
+    """Each ghost walks a two-track ladder: both nodes of each rung lead to
+    the next rung, so the instructions pick the track but not the progress.
+    The last rung leads to the ghost's Z node, which leads back to the first
+    rung. The steps from A to Z and from Z back to Z are then equal, as the
+    LCM solution of part two expects.
+    """
+    num_ghosts = 6
+    num_instructions = 263
+    ladder_length = 58 * scale
+
+    # Regular node names never end in A or Z
+    name_alphabet = "BCDEFGHIJKLMNOPQRSTUVWXY"
+    name_width = max(3, math.ceil(math.log(2 * num_ghosts * ladder_length * 1.2 + 1, len(name_alphabet))) + 1)
+
+    def encode_name(idx: int, width: int) -> str:
+        chars = []
+        for _ in range(width):
+            idx, rem = divmod(idx, len(name_alphabet))
+            chars.append(name_alphabet[rem])
+        return "".join(reversed(chars))
+
+    instructions = "".join(rng.choices("LR", k=num_instructions))
+
+    lines = []
+    node_counter = 0
+    for ghost in range(num_ghosts):
+        if ghost == 0:
+            start, end = "AAA", "ZZZ"
+        else:
+            prefix = encode_name(ghost, name_width - 1)
+            start, end = prefix + "A", prefix + "Z"
+
+        num_rungs = rng.randint(int(ladder_length * 0.8), int(ladder_length * 1.2))
+        rungs = [
+            (encode_name(node_counter + 2 * i, name_width), encode_name(node_counter + 2 * i + 1, name_width))
+            for i in range(num_rungs)
+        ]
+        node_counter += 2 * num_rungs
+
+        lines.append(f"{start} = ({rungs[0][0]}, {rungs[0][1]})")
+        lines.append(f"{end} = ({rungs[0][0]}, {rungs[0][1]})")
+        for (left, right), (next_left, next_right) in zip(rungs, rungs[1:] + [(end, end)]):
+            lines.append(f"{left} = ({next_left}, {next_right})")
+            lines.append(f"{right} = ({next_left}, {next_right})")
+
+    rng.shuffle(lines)
+    return instructions + "\n\n" + "\n".join(lines) + "\n"
+
+
+def generate_day_9(scale: int, rng: random.Random) -> str:
+    """Each history is a polynomial with integer coefficients, so its
+    differences eventually reach all zeros.
+    """
+    lines = []
+    for _ in range(200 * scale):
+        coefficients = [rng.randint(-5, 5) for _ in range(rng.randint(1, 7))]
+        history = [
+            sum(coef * x ** power for power, coef in enumerate(coefficients))
+            for x in range(rng.randint(-5, 5), 21)
+        ][-21:]
+        lines.append(" ".join(map(str, history)))
+
+    return "\n".join(lines) + "\n"
+
+
+def generate_day_10(scale: int, rng: random.Random) -> str:
+    """A serpentine loop covering the whole grid, starting at the top-left.
+
+    The loop visits row 0 left to right, snakes through the remaining rows
+    over columns 1.., and returns to the start through column 0. Each tile
+    only depends on its position, so rows are built one at a time.
+    """
+    side = 140 * math.sqrt(scale)
+    num_rows = max(2, 2 * round(side / 2))      # the serpentine needs an even number of rows
+    num_cols = max(2, round(side))
+    last_row, last_col = num_rows - 1, num_cols - 1
+
+    pipe_for_directions = {
+        frozenset("NS"): "|", frozenset("EW"): "-", frozenset("NE"): "L",
+        frozenset("NW"): "J", frozenset("SW"): "7", frozenset("SE"): "F",
+    }
+
+    def get_pipe(row: int, col: int) -> str:
+        """Pipe joining the loop's previous and next tiles around (row, col)."""
+        if row == 0:
+            directions = ("E" if col < last_col else "S", "W" if col > 0 else "S")
+        elif col == 0:
+            directions = ("N", "S" if row < last_row else "E")
+
+        # Odd rows go right to left, even rows left to right; each row is
+        # entered from above, and left downwards (or, on the last row, west
+        # to column 0)
+        elif row % 2 == 1:
+            directions = (
+                "N" if col == last_col else "E",
+                ("S" if row < last_row else "W") if col == 1 else "W",
+            )
+        else:
+            directions = ("N" if col == 1 else "W", "S" if col == last_col else "E")
+
+        return pipe_for_directions[frozenset(directions)]
+
+    # Tiles between column 1 and the last column are all straight "-"
+    rows = []
+    for row in range(num_rows):
+        rows.append(
+            ("S" if row == 0 else get_pipe(row, 0))
+            + get_pipe(row, 1)
+            + "-" * max(0, num_cols - 3)
+            + (get_pipe(row, last_col) if last_col > 1 else "")
+        )
+
+    return "\n".join(rows) + "\n"
+
+
+def generate_day_11(scale: int, rng: random.Random) -> str:
+    width = 140
+    return "".join(
+        "".join("#" if rng.random() < 0.02 else "." for _ in range(width)) + "\n"
+        for _ in range(140 * scale)
+    )
+
+
+GENERATORS: dict[int, Callable[[int, random.Random], str]] = {
+    1: generate_day_1,
+    2: generate_day_2,
+    3: generate_day_3,
+    4: generate_day_4,
+    5: generate_day_5,
+    6: generate_day_6,
+    7: generate_day_7,
+    8: generate_day_8,
+    9: generate_day_9,
+    10: generate_day_10,
+    11: generate_day_11,
+}
+
+
+def generate_input(day: int, scale: int, seed: int = DEFAULT_SEED) -> str:
+    """Generate the input of `day` at `scale`; the same seed always yields the same input."""
+    return GENERATORS[day](scale, random.Random(f"{seed}-{day}-{scale}"))
+
+
+### Running and fitting
+def run_part(day: int, part: int, input_path: Path, timeout: float) -> dict:
+    """Run one part of a day in a fresh process, returning the parse and solve times.
+
+    Returns a dict with an "error" entry if the run failed or timed out.
+    """
+    cmd = [
+        sys.executable, str(ROOT_DIR / "aoc.py"), str(day),
+        "--part", str(part), "--input", str(input_path.resolve()), "--json", "--no-memory",
+    ]
+    try:
+        completed = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {timeout}s"}
+
+    if completed.returncode != 0:
+        error_lines = completed.stderr.strip().splitlines() or ["unknown error"]
+        return {"error": error_lines[-1]}
+
+    report = json.loads(completed.stdout)["results"][0]
+    part_report = report["parts"][str(part)]
+    if part_report["answer"] is None:
+        return {"error": "not solved (no answer)"}
+
+    return {
+        "parse": report["parse"]["wall_time"],
+        part: part_report["wall_time"],
+    }
+
+
+def fit_exponent(timings: dict[int, float]) -> float | None:
+    """Least-squares slope of log(time) on log(scale), ignoring noisy runs."""
+    points = [
+        (math.log(scale), math.log(seconds))
+        for scale, seconds in timings.items()
+        if seconds >= MIN_FIT_TIME
+    ]
+    if len(points) < 2:
+        return None
+
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def benchmark_day(
+        day: int,
+        scales: list[int],
+        work_dir: Path,
+        seed: int = DEFAULT_SEED,
+        timeout: float = 60.0,
+        max_input_size: float = DEFAULT_MAX_INPUT_SIZE,
+    ) -> dict:
+    """Benchmark each phase of a day over all `scales`.
+
+    A part stops at the first scale where it fails, times out, or has no
+    answer (e.g., it isn't solved yet). The whole day stops once its input
+    would grow beyond `max_input_size` MiB, or takes longer than `timeout`
+    to generate.
+
+    Returns
+    -------
+    day_results : dict
+        Maps each phase ("parse", "1", "2") to its timings per scale, its
+        fitted exponent, and any errors.
+    """
+    timings = {phase: {} for phase in ("parse", "1", "2")}
+    errors = {}
+    active_parts = [1, 2]
+    prev_scale, prev_input_size = None, None
+
+    def stop_active_parts(error: str):
+        for part in active_parts:
+            errors[str(part)] = error
+        active_parts.clear()
+
+    for scale in scales:
+        if not active_parts:
+            break
+
+        # Input sizes grow about linearly with the scale
+        if prev_input_size is not None and prev_input_size * scale / prev_scale > max_input_size * 2**20:
+            stop_active_parts(f"scale {scale}: input would exceed {max_input_size} MiB")
+            break
+
+        input_path = work_dir / f"day-{day}-scale-{scale}.txt"
+        generation_start = time.perf_counter()
+        input_path.write_text(generate_input(day, scale, seed=seed))
+        generation_time = time.perf_counter() - generation_start
+        prev_scale, prev_input_size = scale, input_path.stat().st_size
+
+        for part in list(active_parts):
+            run_result = run_part(day, part, input_path, timeout=timeout)
+            if "error" in run_result:
+                errors[str(part)] = f"scale {scale}: {run_result['error']}"
+                active_parts.remove(part)
+                continue
+
+            timings[str(part)][scale] = run_result[part]
+            timings["parse"][scale] = min(run_result["parse"], timings["parse"].get(scale, math.inf))
+
+        input_path.unlink()
+
+        if active_parts and generation_time > timeout:
+            stop_active_parts(f"scale {scale}: input took {generation_time:.1f}s to generate")
+
+    return {
+        phase: {
+            "timings": {str(scale): seconds for scale, seconds in phase_timings.items()},
+            "exponent": fit_exponent(phase_timings),
+            "expected": EXPECTED_COMPLEXITY[day][phase],
+            **({"error": errors[phase]} if phase in errors else {}),
+        }
+        for phase, phase_timings in timings.items()
+    }
+
+
+def find_complexity_violations(results: dict) -> list[str]:
+    """List the phases that grow faster than their expected complexity class."""
+    violations = []
+    for day, day_results in results.items():
+        for phase, phase_results in day_results.items():
+            exponent = phase_results["exponent"]
+            expected_exponent = COMPLEXITY_CLASS_EXPONENTS[phase_results["expected"]]
+
+            if exponent is not None and exponent > expected_exponent + EXPONENT_TOLERANCE:
+                violations.append(
+                    f"day {day} {phase_label(phase)}: grows as n^{exponent:.2f}, "
+                    f"expected O({phase_results['expected']})"
+                )
+    return violations
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """List the (day, phase, scale) runs that got slower than the baseline by
+    more than `threshold` (relative).
+    """
+    regressions = []
+    for day, day_results in results.items():
+        for phase, phase_results in day_results.items():
+            baseline_timings = baseline.get(day, {}).get(phase, {}).get("timings", {})
+
+            for scale, seconds in phase_results["timings"].items():
+                baseline_seconds = baseline_timings.get(scale)
+                if baseline_seconds is None or baseline_seconds < MIN_FIT_TIME:
+                    continue
+
+                if seconds > baseline_seconds * (1 + threshold):
+                    regressions.append(
+                        f"day {day} {phase_label(phase)} at {scale}x: "
+                        f"{seconds:.4f}s vs {baseline_seconds:.4f}s in baseline"
+                    )
+    return regressions
+
+
+def phase_label(phase: str) -> str:
+    return "parse" if phase == "parse" else f"part {phase}"
+
+
+def format_results_table(results: dict, scales: list[int]) -> str:
+    lines = [
+        f"{'day':>4} {'phase':<8} "
+        + " ".join(f"{f'{scale}x (s)':>12}" for scale in scales)
+        + f" {'exponent':>9} {'expected':>9}",
+    ]
+    for day, day_results in results.items():
+        for phase, phase_results in day_results.items():
+            exponent = phase_results["exponent"]
+            lines.append(
+                f"{day:>4} {phase_label(phase):<8} "
+                + " ".join(
+                    f"{seconds:>12.4f}" if (seconds := phase_results['timings'].get(str(scale))) is not None
+                    else f"{'-':>12}"
+                    for scale in scales
+                )
+                + f" {'-' if exponent is None else f'{exponent:.2f}':>9}"
+                + f" {phase_results['expected']:>9}"
+            )
+    return "\n".join(lines)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "days", nargs="*", type=int,
+        help="Days to benchmark (default: all days with a solver).",
+    )
+    parser.add_argument(
+        "--scales", nargs="+", type=int, default=DEFAULT_SCALES,
+        help=f"Input scales relative to the shipped inputs (default: {DEFAULT_SCALES}).",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=DEFAULT_SEED,
+        help=f"Seed for the input generators (default: {DEFAULT_SEED}).",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=60.0,
+        help="Time limit (seconds) for each run; larger scales are skipped once exceeded (default: 60).",
+    )
+    parser.add_argument(
+        "--max-input-size", type=float, default=DEFAULT_MAX_INPUT_SIZE,
+        help="Size limit (MiB) of generated inputs; larger scales are skipped once a day's input "
+             f"would exceed it (default: {DEFAULT_MAX_INPUT_SIZE}).",
+    )
+    parser.add_argument(
+        "--save", type=Path,
+        help="Save the results to this JSON file, to be used as a baseline later.",
+    )
+    parser.add_argument(
+        "--compare", type=Path,
+        help="Compare the results against a baseline saved with --save.",
+    )
+    parser.add_argument(
+        "--regression-threshold", type=float, default=0.25,
+        help="Relative slowdown over the baseline that counts as a regression (default: 0.25).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    days = args.days or find_days()
+    scales = sorted(args.scales)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="aoc-benchmark-") as work_dir:
+        for day in days:
+            print(f"Benchmarking day {day}...", file=sys.stderr)
+            results[str(day)] = benchmark_day(
+                day, scales=scales, work_dir=Path(work_dir), seed=args.seed, timeout=args.timeout,
+                max_input_size=args.max_input_size,
+            )
+
+    print(format_results_table(results, scales))
+
+    for day, day_results in results.items():
+        for phase, phase_results in day_results.items():
+            if "error" in phase_results:
+                print(f"day {day} {phase_label(phase)} stopped at {phase_results['error']}")
+
+    violations = find_complexity_violations(results)
+    if violations:
+        print("\nWorse than the expected complexity:")
+        print("\n".join(f"  {line}" for line in violations))
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = find_regressions(results, baseline["results"], threshold=args.regression_threshold)
+        print(f"\nRegressions against {args.compare}:")
+        print("\n".join(f"  {line}" for line in regressions) if regressions else "  none")
+
+    if args.save:
+        args.save.write_text(json.dumps(
+            {
+                "environment": get_environment_info(),
+                "seed": args.seed,
+                "scales": scales,
+                "results": results,
+            },
+            indent=2,
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
+import os
+import re
 import sys
+import mmap
+from concurrent.futures import ProcessPoolExecutor
 
 
 # Digit finder for Part 1
@@ -18,50 +22,67 @@ def solve_part_one(input: list[str]) -> int:
     )
 
 
-def get_first_and_last_digit(line: str) -> tuple[int, int]:
-    """Return the first and last digit that show up in `line`.
+SPELLED_DIGITS = [
+    "zero",
+    "one", "two", "three", "four", "five",
+    "six", "seven", "eight", "nine",
+]
 
-    Digits can be spelled out ('one' to 'nine') or in characters ('1'-'9').
+
+def build_digit_trie() -> dict:
+    """Build a trie over all digits, spelled ('one') or in characters ('1').
+
+    Each node maps the next character to its child node; nodes that complete a
+    digit hold its value under the `None` key.
     """
-    spelled_digits = [
-        "zero",
-        "one", "two", "three", "four", "five",
-        "six", "seven", "eight", "nine",
-    ]
-    spelled_digits_to_int = dict(zip(spelled_digits, range(10)))
+    trie = {}
+    for digit, digit_spelled in enumerate(SPELLED_DIGITS):
+        for word in (digit_spelled, str(digit)):
+            node = trie
+            for ch in word:
+                node = node.setdefault(ch, {})
+            node[None] = digit
 
-    first_idx, first_digit = len(line), None
-    last_idx, last_digit = -1, None
-    for digit_spelled, digit_char in spelled_digits_to_int.items():
+    return trie
 
-        # Check first occurrence
-        curr_first_idx_spelled = line.find(digit_spelled)
-        curr_first_idx_char = line.find(str(digit_char))
 
-        if curr_first_idx_spelled > -1 and curr_first_idx_spelled == min(first_idx, curr_first_idx_spelled):
-            first_idx = curr_first_idx_spelled
-            first_digit = digit_char
+# Digit matcher for Part 2, built only once
+DIGIT_TRIE = build_digit_trie()
 
-        if curr_first_idx_char > -1 and curr_first_idx_char == min(first_idx, curr_first_idx_char):
-            first_idx = curr_first_idx_char
-            first_digit = digit_char
 
-        # Check last occurrence
-        curr_last_idx_spelled = line.rfind(digit_spelled)
-        curr_last_idx_char = line.rfind(str(digit_char))
+def match_digit_at(line: str, idx: int) -> int | None:
+    """Return the digit starting at position `idx` of `line`, if any."""
+    node = DIGIT_TRIE
+    for pos in range(idx, len(line)):
+        node = node.get(line[pos])
+        if node is None:
+            return None
+        if None in node:
+            return node[None]
 
-        if curr_last_idx_spelled == max(last_idx, curr_last_idx_spelled):
-            last_idx = curr_last_idx_spelled
-            last_digit = digit_char
+    return None
+
+
+def get_first_and_last_digit(line: str) -> tuple[int, int]:
+    """Return the first and last digit that show up in `line`.
 
-        if curr_last_idx_char == max(last_idx, curr_last_idx_char):
-            last_idx = curr_last_idx_char
-            last_digit = digit_char
+    Digits can be spelled out ('one' to 'nine') or in characters ('1'-'9').
 
+    The line is scanned forward until the first digit is found, and backward
+    until the last one is found; no digit is ever a prefix of another, so at
+    most one digit starts at each position.
+    """
+    first_digit = next(
+        (digit for idx in range(len(line)) if (digit := match_digit_at(line, idx)) is not None),
+        None,
+    )
     if first_digit is None:
         raise ValueError(f"No digit found in string '{line}'")
-    else:
-        return (first_digit, last_digit)
+
+    last_digit = next(
+        digit for idx in range(len(line) - 1, -1, -1) if (digit := match_digit_at(line, idx)) is not None
+    )
+    return (first_digit, last_digit)
 
 
 def solve_part_two(input: list[str]) -> int:
@@ -76,8 +97,97 @@ def solve_part_two(input: list[str]) -> int:
     )
 
 
+# Calibration regexes for memory-mapped inputs (bytes, never decoded)
+def compile_calibration_regex(digit_pattern: bytes) -> re.Pattern:
+    """Compile a regex matching each line that contains a digit, capturing its
+    first and last digits.
+
+    Both digits are captured inside lookaheads, so they may overlap (e.g., the
+    last digit of 'twone' is 'one').
+    """
+    return re.compile(
+        rb"^[^\n]*?(?=(" + digit_pattern + rb"))[^\n]*(?=(" + digit_pattern + rb"))",
+        flags=re.MULTILINE,
+    )
+
+
+CALIBRATION_REGEXES = {
+    1: compile_calibration_regex(rb"\d"),
+    2: compile_calibration_regex(b"|".join([rb"\d"] + [word.encode() for word in SPELLED_DIGITS])),
+}
+
+DIGIT_BYTES_TO_INT = {
+    **{str(digit).encode(): digit for digit in range(10)},
+    **{word.encode(): digit for digit, word in enumerate(SPELLED_DIGITS)},
+}
+
+
+def sum_calibration_chunk(path: str, start: int, end: int, part: int) -> int:
+    """Sum the calibration values of the lines in bytes `[start, end[` of the
+    file at `path`.
+
+    Lines without any digit are skipped.
+    """
+    regex = CALIBRATION_REGEXES[part]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return sum(
+            DIGIT_BYTES_TO_INT[match[1]] * 10 + DIGIT_BYTES_TO_INT[match[2]]
+            for match in regex.finditer(buffer, start, end)
+        )
+
+
+def find_chunk_boundaries(buffer, num_chunks: int) -> list[int]:
+    """Split `buffer` into (at most) `num_chunks` chunks of similar size,
+    each ending right after a newline (or at the end of the buffer).
+    """
+    boundaries = [0]
+    for chunk_idx in range(1, num_chunks):
+        newline_pos = buffer.find(b"\n", max(boundaries[-1], len(buffer) * chunk_idx // num_chunks))
+        if newline_pos == -1:
+            break
+        if newline_pos + 1 > boundaries[-1]:
+            boundaries.append(newline_pos + 1)
+
+    if boundaries[-1] < len(buffer):
+        boundaries.append(len(buffer))
+    return boundaries
+
+
+def solve_file_in_chunks(path: str | os.PathLike, part: int, num_workers: int | None = None) -> int:
+    """Solve `part` on a (possibly multi-GB) calibration file.
+
+    The file is memory-mapped and split into newline-aligned chunks, each
+    summed by a worker process directly on the mapped bytes; memory use is
+    independent of the file size. Unlike `solve_part_one`/`solve_part_two`,
+    lines without any digit are skipped instead of raising an error.
+    """
+    path = os.fspath(path)
+    num_workers = num_workers or os.cpu_count()
+
+    if os.path.getsize(path) == 0:
+        return 0
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        boundaries = find_chunk_boundaries(buffer, num_workers)
+
+    chunks = list(zip(boundaries, boundaries[1:]))
+    if num_workers == 1 or len(chunks) == 1:
+        return sum(sum_calibration_chunk(path, start, end, part) for start, end in chunks)
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        return sum(executor.map(
+            sum_calibration_chunk,
+            *zip(*((path, start, end, part) for start, end in chunks)),
+        ))
+
+
 if __name__ == "__main__":
 
+    # Solve a (possibly multi-GB) file given as argument, in parallel chunks
+    if len(sys.argv) > 1:
+        print(solve_file_in_chunks(sys.argv[1], part=2))
+        sys.exit()
+
     # # Solve part 1
     # print(solve_part_one(sys.stdin.readlines()))
 
@@ -153,7 +153,7 @@ def dijkstra(graph: Graph, start: str, end: str = None):
 
 def parse_input(input_lines: list[str]):
     """Parse the input and construct the corresponding graph."""
-    return Graph(input_lines)
+    return Graph([line for line in input_lines if line])
 
 
 def solve_part_one(graph: Graph) -> int:
@@ -163,7 +163,6 @@ def solve_part_one(graph: Graph) -> int:
         graph,
         start=[node for node in graph if graph[node] == "S"][0],
     )
-    print(distances)
     return max(distances.values())
 
 
@@ -1,8 +1,11 @@
 import re
 import sys
 import operator
+from dataclasses import dataclass
 from functools import reduce
 
+import numpy as np
+
 
 COLORS = ["red", "green", "blue"]
 
@@ -13,65 +16,185 @@ MAX_DIE_PART_1 = {
 }
 
 
-def parse_input(input_lines: list[str]) -> dict[int, list[dict[str, int]]]:
+@dataclass
+class CubeGames:
+    """Columnar representation of all games: one entry per revealed set.
+
+    The sets of the i-th game are at positions
+    `game_offsets[i]:game_offsets[i + 1]` of the per-set arrays.
+    """
+    set_game_id: np.ndarray     # int32, ID of the game each set belongs to
+    set_index: np.ndarray       # int32, index of each set within its game
+    red: np.ndarray             # int32, number of red die in each set
+    green: np.ndarray           # int32, number of green die in each set
+    blue: np.ndarray            # int32, number of blue die in each set
+    game_offsets: np.ndarray    # int64, start of each game's sets (plus the total number of sets)
+
+    @property
+    def num_games(self) -> int:
+        return len(self.game_offsets) - 1
+
+    @property
+    def game_ids(self) -> np.ndarray:
+        return self.set_game_id[self.game_offsets[:-1]]
+
+    def get_color(self, color: str) -> np.ndarray:
+        return getattr(self, color)
+
+
+def parse_input(input_lines: list[str]) -> CubeGames:
     """Parse input lines into an organized data structure."""
 
     line_regex = re.compile(r"^Game (?P<id>\d+): (?P<content>.*)$")
     die_set_regex = re.compile(r"(?P<num>\d+) (?P<color>blue|green|red)")
 
+    set_game_id, set_index = [], []
+    color_counts = {color: [] for color in COLORS}
+    game_offsets = [0]
+
+    for line in input_lines:
+        if not (line_match := line_regex.fullmatch(line.strip())):
+            continue
+
+        game_id = int(line_match["id"])
+        game_sets = line_match["content"].split(";")
+        first_set_pos = len(set_game_id)
+
+        set_game_id.extend([game_id] * len(game_sets))
+        set_index.extend(range(len(game_sets)))
+        for counts in color_counts.values():
+            counts.extend([0] * len(game_sets))
+
+        for idx, game_set in enumerate(game_sets):
+            for num, color in die_set_regex.findall(game_set):
+                color_counts[color][first_set_pos + idx] = int(num)
+
+        game_offsets.append(len(set_game_id))
+
+    return CubeGames(
+        set_game_id=np.array(set_game_id, dtype=np.int32),
+        set_index=np.array(set_index, dtype=np.int32),
+        **{color: np.array(counts, dtype=np.int32) for color, counts in color_counts.items()},
+        game_offsets=np.array(game_offsets, dtype=np.int64),
+    )
+
+
+def get_min_die_per_game(games: CubeGames) -> dict[str, np.ndarray]:
+    """Get the minimum number of die of each color that would be required to
+    run each game (i.e., the maximum shown in any of its sets).
+    """
+    if games.num_games == 0:
+        return {color: np.zeros(0, dtype=np.int32) for color in COLORS}
+
     return {
-        int(line_match["id"]): [
-            {
-                set_match["color"]: int(set_match["num"])
-                for set_match in die_set_regex.finditer(game_set)
-            }
-            for game_set in line_match["content"].split(";")
-        ]
-        for line in input_lines
-        if (line_match := line_regex.fullmatch(line.strip()))
+        color: np.maximum.reduceat(games.get_color(color), games.game_offsets[:-1])
+        for color in COLORS
     }
 
 
-def solve_part_one(games: dict[int, list[dict[str, int]]], max_die: dict[str, int]) -> int:
+def solve_part_one(games: CubeGames, max_die: dict[str, int] = MAX_DIE_PART_1) -> int:
     """Solves part one.
 
     Parameters
     ----------
-    games : dict[int, list[dict[str, int]]]
-        A dictionary whose keys are game IDs, and values are lists of revealed
-        sets of die.
+    games : CubeGames
+        The revealed sets of die of every game.
 
-        games[game_id][idx_of_set_in_game][color] = number of die of this color on this set of this game
-
-    max_die : dict[str, int]
-        The maximum number of die allowed per color.
-        Will sum up the IDs of the games that fulfill this constraint.
+    max_die : dict[str, int], optional
+        The maximum number of die allowed per color, by default
+        `MAX_DIE_PART_1`. Will sum up the IDs of the games that fulfill this
+        constraint.
 
     Returns
     -------
     sum : int
         The sum over all game IDs that would be possible using only `max_die`.
     """
-    def check_game_set(game_set: dict[str, int]) -> bool:
-        """Checks whether this `game_set` would be possible with only `max_die`"""
-        return all(
-            game_set.get(color, 0) <= max_die.get(color, 0)
-            for color in game_set.keys() | max_die.keys()
-        )
-
-    return sum(
-        game_id
-        for game_id, game_content in games.items()
-        if all(check_game_set(game_set) for game_set in game_content)
+    if games.num_games == 0:
+        return 0
+
+    # Check whether each set would be possible with only `max_die`
+    set_is_possible = reduce(
+        operator.and_,
+        (games.get_color(color) <= max_die.get(color, 0) for color in COLORS),
     )
 
+    # A game is possible if all of its sets are
+    game_is_possible = np.logical_and.reduceat(set_is_possible, games.game_offsets[:-1])
+
+    return int(games.game_ids[game_is_possible].sum(dtype=np.int64))
+
+
+class PossibleGamesIndex:
+    """Answers "sum of the IDs of the games possible with `max_die`" for many
+    different `max_die` constraints on the same games.
 
-def solve_part_two(games: dict[int, list[dict[str, int]]]) -> int:
+    A game is possible iff each color's bound is at least that game's minimum
+    number of die of the color (see `get_min_die_per_game`), i.e., iff the
+    query dominates the game's minimum die. Distinct minimum die values are
+    compressed per color, and a 3D prefix-sum table over them holds the sum of
+    IDs of all games dominated by each cell; a query is then one
+    `searchsorted` per color plus a table lookup.
+
+    If the compressed table would be larger than `max_table_size` cells,
+    queries fall back to a vectorized scan of the games' minimum die.
+    """
+
+    def __init__(self, games: CubeGames, max_table_size: int = 2 ** 24):
+        self.min_die = get_min_die_per_game(games)
+        self.game_ids = games.game_ids.astype(np.int64)
+
+        # Distinct values of each color's minimum die, and the position of each game's
+        self.axis_values = {}
+        axis_positions = {}
+        for color in COLORS:
+            self.axis_values[color], axis_positions[color] = np.unique(self.min_die[color], return_inverse=True)
+
+        table_shape = tuple(len(self.axis_values[color]) for color in COLORS)
+        self.table = None
+        if 0 < np.prod(table_shape, dtype=np.int64) <= max_table_size:
+            self.table = np.zeros(table_shape, dtype=np.int64)
+            np.add.at(self.table, tuple(axis_positions[color] for color in COLORS), self.game_ids)
+            for axis in range(len(COLORS)):
+                np.cumsum(self.table, axis=axis, out=self.table)
+
+    def sum_possible_game_ids(self, max_die: dict[str, int]) -> int:
+        """Sum the IDs of the games that would be possible using only `max_die`."""
+        return self.sum_possible_game_ids_batch([max_die])[0]
+
+    def sum_possible_game_ids_batch(self, max_die_list: list[dict[str, int]]) -> list[int]:
+        """Answer `sum_possible_game_ids` for each constraint in `max_die_list`."""
+        bounds = {
+            color: np.array([max_die.get(color, 0) for max_die in max_die_list], dtype=np.int64)
+            for color in COLORS
+        }
+
+        # Fallback: check every game against each constraint
+        if self.table is None:
+            return [
+                int(self.game_ids[
+                    reduce(operator.and_, (self.min_die[color] <= bounds[color][idx] for color in COLORS))
+                ].sum())
+                for idx in range(len(max_die_list))
+            ]
+
+        # Index of the largest distinct value within each bound (-1 if none is)
+        positions = [
+            np.searchsorted(self.axis_values[color], bounds[color], side="right") - 1
+            for color in COLORS
+        ]
+        any_empty = reduce(operator.or_, (pos < 0 for pos in positions))
+
+        sums = self.table[tuple(np.maximum(pos, 0) for pos in positions)]
+        return np.where(any_empty, 0, sums).tolist()
+
+
+def solve_part_two(games: CubeGames) -> int:
     """Solve part two.
 
     Parameters
     ----------
-    games : dict[int, list[dict[str, int]]]
+    games : CubeGames
         The series of games played.
 
     Returns
@@ -79,20 +202,13 @@ def solve_part_two(games: dict[int, list[dict[str, int]]]) -> int:
     sum : int
         The sum over the power of each game's min cube set.
     """
+    min_die = get_min_die_per_game(games)
 
-    def get_min_die_for_game(game_sets: list[dict[str, int]]) -> dict:
-        """Get the minimum set of die that would be required to run the `game_sets`."""
-        return {
-            color: max(gset.get(color, 0) for gset in game_sets)
-            for color in COLORS
-        }
-
-    return sum(
+    return int(
         reduce(
             operator.mul,
-            get_min_die_for_game(game_).values()
-        )
-        for game_ in games.values()
+            (min_die[color].astype(np.int64) for color in COLORS),
+        ).sum()
     )
 
 
@@ -2,134 +2,220 @@ import re
 import sys
 import operator
 from functools import reduce
+from typing import Iterable, Iterator
+from collections import deque
 from itertools import product
+from dataclasses import dataclass
 
+import numpy as np
 
-def solve_part_two(input_lines: list[str]) -> int:
+
+@dataclass
+class Schematic:
+    """The engine schematic, plus an index of the numbers in it.
+
+    `number_ids[row][col]` is the ID of the number with a digit at that
+    position (or -1), and `number_values[number_id]` is its value.
+    """
+    lines: list[str]
+    number_ids: list[list[int]]
+    number_values: list[int]
+
+    def get_adjacent_number_ids(self, row: int, col: int) -> set[int]:
+        """Get the IDs of the numbers touching the given position (diagonals included)."""
+        return {
+            number_id
+            for adj_row in range(max(0, row - 1), min(len(self.lines), row + 2))
+            for number_id in self.number_ids[adj_row][max(0, col - 1): col + 2]
+            if number_id >= 0
+        }
+
+    def iter_symbol_positions(self, symbols: str = None) -> Iterator[tuple[int, int]]:
+        """Iterate over the positions of all symbols (or only those in `symbols`)."""
+        for row, line in enumerate(self.lines):
+            for col, char in enumerate(line):
+                if (char in symbols) if symbols else is_symbol(char):
+                    yield row, col
+
+
+def parse_input(input_lines: list[str]) -> Schematic:
+    """Parse the schematic, labelling the position of each digit with the ID of
+    its number.
+    """
+    number_regex = re.compile(r"\d+")
+
+    number_ids, number_values = [], []
+    for line in input_lines:
+        row_ids = [-1] * len(line)
+        for match in number_regex.finditer(line):
+            row_ids[match.start(): match.end()] = [len(number_values)] * (match.end() - match.start())
+            number_values.append(int(match[0]))
+        number_ids.append(row_ids)
+
+    return Schematic(lines=input_lines, number_ids=number_ids, number_values=number_values)
+
+
+def solve_part_two(schematic: Schematic) -> int:
     """Solve part two.
 
-    Scan each line for asterisk symbols, "*", and for each symbol check whether
-    it's contacting exactly two numbers. Finally, sum up the product of all such
-    two numbers.
+    Scan the schematic for asterisk symbols, "*", and for each symbol check
+    whether it's contacting exactly two numbers. Finally, sum up the product of
+    all such two numbers.
 
     Parameters
     ----------
-    input_lines : list[str]
-        The input lines.
+    schematic : Schematic
+        The parsed schematic.
 
     Returns
     -------
     sum : int
         The sum of all products between numbers contacting the same "gear".
     """
-    asterisk_regex = re.compile(r"[*]")
-
     return sum(
-        reduce(operator.mul, number_pair)
-        for line_idx, line in enumerate(input_lines)
-        for match in asterisk_regex.finditer(line)
-        if (
-            number_pair := two_numbers_contacting_asterisk(
-                input_lines,
-                row=line_idx,
-                col=match.start(),
-            )
-        )
+        reduce(operator.mul, (schematic.number_values[number_id] for number_id in number_pair))
+        for row, col in schematic.iter_symbol_positions(symbols="*")
+        if len(number_pair := schematic.get_adjacent_number_ids(row, col)) == 2
     )
 
 
-def two_numbers_contacting_asterisk(
-        input_lines: list[str],
-        row: int,
-        col: int,
-    ) -> bool:
-    """Checks whether there are *exactly* two numbers contacting the given
-    asterisk.
+def solve_part_one(schematic: Schematic) -> int:
+    """Solve part one.
+
+    Scan the schematic for symbols and collect every number contacting any of
+    them. Finally sum up all numbers that are contacting any symbol.
+
+    Parameters
+    ----------
+    schematic : Schematic
+        The parsed schematic.
+
+    Returns
+    -------
+    sum : int
+        The sum of all numbers fulfilling the constraint.
     """
-    number_regex = re.compile(r"\d+")
+    numbers_contacting_symbols = set()
+    for row, col in schematic.iter_symbol_positions():
+        numbers_contacting_symbols |= schematic.get_adjacent_number_ids(row, col)
 
-    # NOTE: these matches should be pre-computed for all asterisks
-    all_number_matches = {
-        line_idx: set(list(number_regex.finditer(line)))
-        for line_idx, line in enumerate(input_lines)
-    }
-
-    def get_number_match_at_pos(num_row, num_col) -> object:
-        for m in all_number_matches[num_row]:
-            if m.start() <= num_col and m.end() >= num_col:
-                return m
-        
-        raise ValueError(f"Number not found at pos {(num_row, num_col)}")
-
-    line_len = len(input_lines[row])
-    adjacent_tiles = list(
-        product(
-            range(max(0, row-1), min(len(input_lines), row+2)),
-            range(max(0, col-1), min(line_len, col+2))
-        )
-    )
+    return sum(schematic.number_values[number_id] for number_id in numbers_contacting_symbols)
 
-    matches_contacting_asterisk = set()
-    for adj_row, adj_col in adjacent_tiles:
 
-        # Is there a digit at this position
-        if input_lines[adj_row][adj_col].isdigit():
-            m = get_number_match_at_pos(adj_row, adj_col)
-            matches_contacting_asterisk |= {m}
+def solve_part_one_numpy(schematic: Schematic) -> int:
+    """Solve part one with vectorized operations; same result as `solve_part_one`.
 
-    # If exactly two matches: return the number pair
-    if len(matches_contacting_asterisk) == 2:
-        return [int(m[0]) for m in matches_contacting_asterisk]
-    else:
-        return False
+    The schematic becomes a byte array, and the symbol mask is dilated to its
+    3x3 neighbourhood. Numbers are the runs of digits in row-major order (the
+    order of `schematic.number_values`); a number counts if any of its digits
+    falls in the dilated mask.
+    """
+    if not schematic.number_values:
+        return 0
 
+    # Pad every row with a trailing "." so that runs of digits never wrap rows
+    width = max(len(line) for line in schematic.lines) + 1
+    grid = np.frombuffer(
+        "".join(line.ljust(width, ".") for line in schematic.lines).encode(),
+        dtype=np.uint8,
+    ).reshape(len(schematic.lines), width)
 
-def solve_part_one(input_lines: list[str]) -> int:
-    """Solve part one.
-    
-    Scan the input lines and, for each number, check whether it's contacting any
-    symbol. Finally sum up all numbers that are contacting any symbol.
+    is_digit = (grid >= ord("0")) & (grid <= ord("9"))
+    is_symbol_mask = ~is_digit & (grid != ord("."))
+
+    # Dilate the symbol mask: OR of the 9 shifts of the (zero-padded) mask
+    padded = np.pad(is_symbol_mask, 1)
+    near_symbol = np.zeros_like(is_symbol_mask)
+    for delta_row, delta_col in product(range(3), range(3)):
+        near_symbol |= padded[delta_row: delta_row + grid.shape[0], delta_col: delta_col + grid.shape[1]]
+
+    # Label each digit with the index of its number (i.e., of its run of digits)
+    flat_is_digit = is_digit.ravel()
+    run_starts = flat_is_digit & ~np.concatenate(([False], flat_is_digit[:-1]))
+    digit_labels = np.cumsum(run_starts)[flat_is_digit & near_symbol.ravel()] - 1
+
+    number_values = np.array(schematic.number_values, dtype=np.int64)
+    return int(number_values[np.unique(digit_labels)].sum())
+
+
+def iter_row_contributions(lines: Iterable[str]) -> Iterator[tuple[int, int]]:
+    """Stream the schematic row by row, keeping only a window of three rows.
+
+    A row's contributions depend only on the rows right above and below it, so
+    they are yielded as soon as the row below has been read, and the row above
+    is then dropped from the window. Memory use is independent of the number
+    of rows.
 
     Parameters
     ----------
-    input_lines : list[str]
-        Input lines.
-    
-    Returns
-    -------
-    sum : int
-        The sum of all numbers fulfilling the constraint.
+    lines : Iterable[str]
+        The schematic rows, e.g., an open file or `sys.stdin`.
+
+    Yields
+    ------
+    part_one, part_two : tuple[int, int]
+        For each row, the sum of its numbers contacting any symbol, and the sum
+        of the gear ratios of its asterisks.
     """
-    line_regex = re.compile(r"(\d+)")
+    number_regex = re.compile(r"\d+")
 
-    return sum(
-        int(num_match[0])
-        for line_idx, line in enumerate(input_lines)
-        for num_match in line_regex.finditer(line)
-        if any_symbol_contacting_number_at(
-            input_lines,
-            row=line_idx,
-            col=num_match.start(),
-            num_digits=num_match.end() - num_match.start(),
-        )
-    )
+    # Each row is kept as (line, [(number start, number end, number value), ...])
+    window = deque(maxlen=3)
+    for line in lines:
+        line = line.strip()
+        window.append((line, [(m.start(), m.end(), int(m[0])) for m in number_regex.finditer(line)]))
+
+        # The row before last now has both of its neighbours in the window
+        if len(window) > 1:
+            yield score_row_in_window(window[-2], window)
+
+    # The last row has no row below it
+    if window:
+        yield score_row_in_window(window[-1], list(window)[-2:])
 
 
-def any_symbol_contacting_number_at(
-        input_lines: list[str],
-        row: int,
-        col: int,
-        num_digits: int,
-    ) -> bool:
-    """Checks whether the number at the given position is in contact with any
-    symbol.
+def score_row_in_window(row: tuple[str, list], window: Iterable[tuple[str, list]]) -> tuple[int, int]:
+    """Score the part one and part two contributions of `row`, given the rows
+    around it (`row` itself included).
     """
-    return any(
-        is_symbol(char)
-        for line in input_lines[max(0, row - 1): min(len(input_lines), row + 2)]
-        for char in line[max(0, col-1): min(len(line), col + num_digits + 1)]
+    line, numbers = row
+
+    part_one = sum(
+        value
+        for start, end, value in numbers
+        if any(
+            is_symbol(char)
+            for window_line, _ in window
+            for char in window_line[max(0, start - 1): end + 1]
+        )
     )
 
+    part_two = 0
+    for col, char in enumerate(line):
+        if char != "*":
+            continue
+
+        adjacent_values = [
+            value
+            for _, window_numbers in window
+            for start, end, value in window_numbers
+            if start - 1 <= col <= end
+        ]
+        if len(adjacent_values) == 2:
+            part_two += adjacent_values[0] * adjacent_values[1]
+
+    return part_one, part_two
+
+
+def solve_streaming(lines: Iterable[str]) -> tuple[int, int]:
+    """Solve both parts in constant memory; see `iter_row_contributions`."""
+    part_one, part_two = 0, 0
+    for row_part_one, row_part_two in iter_row_contributions(lines):
+        part_one += row_part_one
+        part_two += row_part_two
+
+    return part_one, part_two
+
 
 def is_symbol(char: str):
     return not char.isdigit() and char != '.'
@@ -137,6 +223,10 @@ def is_symbol(char: str):
 
 def main():
 
+    # # Stream the schematic from stdin in constant memory (both parts)
+    # print(*solve_streaming(sys.stdin), sep="\n", file=sys.stdout)
+    # return
+
     # # Read input
     # # > Load from stdin
     # input_lines = sys.stdin.readlines()
@@ -148,9 +238,12 @@ def main():
         l.strip() for l in input_path.read_text().split("\n")
     ]
 
+    # Parse input
+    schematic = parse_input(input_lines)
+
     # Solve problem
-    # output = solve_part_one(input_lines)
-    output = solve_part_two(input_lines)
+    # output = solve_part_one(schematic)
+    output = solve_part_two(schematic)
 
     # Write to stdout
     print(output, file=sys.stdout)
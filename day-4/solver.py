@@ -1,82 +1,251 @@
 import re
 import sys
+from typing import Iterable, Iterator
+from dataclasses import dataclass
 
+import numpy as np
 
-def parse_input(input_lines: list[str]) -> list[tuple[set[int], set[int]]]:
-    """Parses the input lines into a data structure."""
+
+# Numbers are stored as bits of two 64-bit words, so they must be below this
+MAX_NUMBER = 128
+
+
+@dataclass
+class Cards:
+    """All cards, with each card's numbers stored as a bitmask.
+
+    Number `n` of the i-th card is bit `n % 64` of word `n // 64` of row i.
+    """
+    winners: np.ndarray     # uint64, shape (num_cards, 2)
+    have: np.ndarray        # uint64, shape (num_cards, 2)
+
+    @property
+    def num_cards(self) -> int:
+        return len(self.winners)
+
+
+def parse_input(input_lines: list[str]) -> Cards:
+    """Parses the input lines into a data structure.
+
+    Inputs in the usual fixed-width layout (numbers right-aligned in
+    2-character columns, the same number of them on every card) are parsed with vectorized
+    operations; other inputs fall back to parsing each line with a regex.
+    """
+    card_lines = [line for line in input_lines if line.startswith("Card")]
+    return parse_fixed_width_cards(card_lines) or parse_cards_with_regex(card_lines)
+
+
+def parse_fixed_width_cards(card_lines: list[str]) -> Cards | None:
+    """Parse card lines in the fixed-width layout, or return None if they
+    don't follow it.
+    """
+    # Only the part after "Card <id>" needs to be fixed-width
+    number_lines = [line[line.find(":"):] for line in card_lines]
+    if not number_lines or len({len(line) for line in number_lines}) > 1:
+        return None
+
+    first_line = number_lines[0]
+    colon_col, bar_col = 0, first_line.find("|")
+    if bar_col < 0 or not first_line.startswith(":"):
+        return None
+
+    # Both sections (between ":" and " |", and after "|") must be whole " dd"
+    # groups, so that every column is either part of a number or a separator
+    if (bar_col - 1 - (colon_col + 1)) % 3 != 0 or (len(first_line) - (bar_col + 1)) % 3 != 0:
+        return None
+
+    # Columns where each 2-character number starts: ": 41 48 | 83  6"
+    winners_cols = range(colon_col + 2, bar_col - 1, 3)
+    have_cols = range(bar_col + 2, len(first_line), 3)
+
+    grid = np.frombuffer("".join(number_lines).encode(), dtype=np.uint8).reshape(len(number_lines), -1)
+    if grid.shape[1] != len(first_line):    # non-ASCII input
+        return None
+
+    # Cards without winners or without numbers are dropped by the regex parser
+    if not winners_cols or not have_cols:
+        return None
+
+    separator_cols = [bar_col - 1, *(col - 1 for col in (*winners_cols, *have_cols))]
+    if (
+        (grid[:, colon_col] != ord(":")).any()
+        or (grid[:, bar_col] != ord("|")).any()
+        or (grid[:, separator_cols] != ord(" ")).any()
+    ):
+        return None
+
+    def parse_number_columns(cols: range) -> np.ndarray | None:
+        tens = grid[:, [col for col in cols]].astype(np.int64)
+        ones = grid[:, [col + 1 for col in cols]].astype(np.int64)
+        tens = np.where(tens == ord(" "), ord("0"), tens) - ord("0")
+        ones -= ord("0")
+        if ((tens < 0) | (tens > 9) | (ones < 0) | (ones > 9)).any():
+            return None
+        return numbers_to_bitmasks(tens * 10 + ones)
+
+    winners, have = parse_number_columns(winners_cols), parse_number_columns(have_cols)
+    if winners is None or have is None:
+        return None
+
+    return Cards(winners=winners, have=have)
+
+
+def numbers_to_bitmasks(numbers: np.ndarray) -> np.ndarray:
+    """Convert a (num_cards, numbers per card) array into (num_cards, 2) bitmasks."""
+    if numbers.size and (numbers.min() < 0 or numbers.max() >= MAX_NUMBER):
+        raise ValueError(f"Card numbers must be in [0, {MAX_NUMBER}[")
+
+    numbers = numbers.astype(np.uint64)
+    bits = np.left_shift(np.uint64(1), numbers % np.uint64(64))
+    word_idx = numbers // np.uint64(64)
+
+    return np.stack(
+        [
+            np.bitwise_or.reduce(np.where(word_idx == word, bits, np.uint64(0)), axis=1)
+            for word in range(2)
+        ],
+        axis=1,
+    )
+
+
+def parse_cards_with_regex(card_lines: list[str]) -> Cards:
+    """Parse card lines of any layout, one line at a time."""
 
     line_regex = re.compile(r"Card\s+(\d+):\s+(?P<winners>.*)\s+[|]\s+(?P<have>.*)")
     numbers_regex = re.compile(r"\d+")
 
-    return [
-        (
-            set(numbers_regex.findall(match["winners"])),
-            set(numbers_regex.findall(match["have"])),
-        )
-        for line in input_lines
-        if (match := line_regex.fullmatch(line))
-    ]
+    def to_bitmask(numbers: list[str]) -> tuple[int, int]:
+        mask = 0
+        for number in map(int, numbers):
+            if number >= MAX_NUMBER:
+                raise ValueError(f"Card numbers must be in [0, {MAX_NUMBER}[")
+            mask |= 1 << number
+        return mask & (2 ** 64 - 1), mask >> 64
 
+    winners, have = [], []
+    for line in card_lines:
+        if (match := line_regex.fullmatch(line)):
+            winners.append(to_bitmask(numbers_regex.findall(match["winners"])))
+            have.append(to_bitmask(numbers_regex.findall(match["have"])))
 
-def solve_part_two(card_list: list[tuple[set, set]]) -> int:
+    return Cards(
+        winners=np.array(winners, dtype=np.uint64).reshape(-1, 2),
+        have=np.array(have, dtype=np.uint64).reshape(-1, 2),
+    )
+
+
+def count_matches(cards: Cards) -> np.ndarray:
+    """Count, for each card, the numbers we have that are winning numbers."""
+    return popcount(cards.winners & cards.have).sum(axis=1)
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Count the set bits of each uint64 word."""
+    if hasattr(np, "bitwise_count"):    # numpy >= 2.0
+        return np.bitwise_count(words).astype(np.int64)
+
+    bytes_view = words.view(np.uint8).reshape(*words.shape, 8)
+    return np.unpackbits(bytes_view, axis=-1).sum(axis=-1, dtype=np.int64)
+
+
+def solve_part_two(cards: Cards) -> int:
     """Solve part two.
+
+    Each card scores 1 for itself, plus the score of each of the next n cards
+    it wins a copy of, where n is its number of matches. Cards are scored from
+    last to first, keeping the suffix sums of the scores so that the score of
+    each card is computed in O(1).
     """
-    return sum(
-        score_card_part_two(card_list, idx)
-        for idx in range(len(card_list))
-    )
+    return count_scratchcards(count_matches(cards).tolist())
 
 
-def score_card_part_two(
-        card_list: list[tuple[set, set]],
-        idx: int,
-        cache: dict[int, int] = {},     # caching already scored cards
-    ) -> int:
-    """Score the card at position `idx` by recursively scoring cards from `idx`
-    to `idx+n`, where n is the number of matches on the initial card.
+def count_scratchcards(match_counts: list[int]) -> int:
+    """Count the total number of scratchcards won, given each card's number of
+    matches (see `solve_part_two`).
     """
-    # Check if function was called with an out of range index
-    if idx >= len(card_list):
-        return 0
-
-    # If card has not been scored, score it and save the result
-    if idx not in cache:
-        curr_winners, curr_have = card_list[idx]
-        num_matches = len(curr_winners & curr_have)
-
-        # Score:
-        # 1 for the current scratchcard,
-        # plus the score of each subsequent scratchcard obtained (the next
-        # `num_matches` cards)
-        cache[idx] = 1 + sum(
-            score_card_part_two(
-                card_list,
-                idx=idx + j,
-            )
-            for j in range(1, num_matches + 1)
-        )
+    num_cards = len(match_counts)
 
-    return cache[idx]
+    # score_suffix_sums[idx] = sum of the scores of cards idx, idx+1, ...
+    score_suffix_sums = [0] * (num_cards + 1)
+    for idx in range(num_cards - 1, -1, -1):
+        last_won_idx = min(num_cards - 1, idx + match_counts[idx])
+        card_score = 1 + score_suffix_sums[idx + 1] - score_suffix_sums[last_won_idx + 1]
+        score_suffix_sums[idx] = card_score + score_suffix_sums[idx + 1]
 
+    return score_suffix_sums[0]
 
-def solve_part_one(card_list: list[tuple[set, set]]) -> int:
-    """Solve part one: sum up the score of all cards.
+
+def iter_scratchcard_totals(lines: Iterable[str]) -> Iterator[int]:
+    """Stream cards one line at a time (e.g., from `sys.stdin`), yielding the
+    running total number of scratchcards after each card (see `solve_part_two`).
+
+    A card only wins copies of the next n cards, where n is at most its number
+    of winning numbers; the extra copies still pending for the upcoming cards
+    are kept in a ring buffer of that size, so memory use is independent of
+    the number of cards.
     """
-    return sum(
-        score_card_part_one(card=c) for c in card_list
-    )
+    line_regex = re.compile(r"Card\s+(\d+):\s+(?P<winners>.*)\s+[|]\s+(?P<have>.*)")
+    numbers_regex = re.compile(r"\d+")
+
+    # pending_copies[(head + j) % len(pending_copies)] = extra copies of the j-th next card
+    pending_copies = []
+    head = 0
+
+    total = 0
+    for line in lines:
+        if not (match := line_regex.fullmatch(line.strip())):
+            continue
+
+        winners = set(numbers_regex.findall(match["winners"]))
+        num_matches = len(winners & set(numbers_regex.findall(match["have"])))
+
+        # Grow the buffer (in order) if this card could win more cards than it holds
+        if len(winners) > len(pending_copies):
+            pending_copies = (
+                pending_copies[head:] + pending_copies[:head]
+                + [0] * (len(winners) - len(pending_copies))
+            )
+            head = 0
+
+        # Copies of the current card: the original plus the pending ones
+        num_copies = 1
+        if pending_copies:
+            num_copies += pending_copies[head]
+            pending_copies[head] = 0
+            head = (head + 1) % len(pending_copies)
 
+        # Each copy wins one copy of each of the next `num_matches` cards
+        for j in range(num_matches):
+            pending_copies[(head + j) % len(pending_copies)] += num_copies
 
-def score_card_part_one(card: tuple[set, set]) -> int:
-    """Score the card by 2^(matches - 1), or zero if no match is made.
+        total += num_copies
+        yield total
+
+
+def solve_part_two_streaming(lines: Iterable[str]) -> int:
+    """Solve part two in memory independent of the number of cards."""
+    total = 0
+    for total in iter_scratchcard_totals(lines):
+        pass
+    return total
+
+
+def solve_part_one(cards: Cards) -> int:
+    """Solve part one: sum up the score of all cards.
+
+    Each card scores 2^(matches - 1), or zero if no match is made.
     """
-    winners, have = card
-    num_matches = len(winners & have)
-    return 2 ** (num_matches - 1) if num_matches > 0 else 0
+    num_matches = count_matches(cards)
+    scores = np.where(num_matches > 0, np.left_shift(1, np.maximum(num_matches - 1, 0)), 0)
+    return int(scores.sum())
 
 
 def main():
 
+    # # Stream cards from stdin, in constant memory (part two only)
+    # print(solve_part_two_streaming(sys.stdin), file=sys.stdout)
+    # return
+
     # # Read input
     # # > Load from stdin
     # input_lines = sys.stdin.readlines()
@@ -89,11 +258,11 @@ def main():
     ]
 
     # Parse input
-    card_list = parse_input(input_lines)
+    cards = parse_input(input_lines)
 
     # Solve problem
-    # output = solve_part_one(card_list)
-    output = solve_part_two(card_list)
+    # output = solve_part_one(cards)
+    output = solve_part_two(cards)
 
     # Write to stdout
     print(output, file=sys.stdout)
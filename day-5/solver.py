@@ -1,25 +1,22 @@
+import os
 import re
 import sys
-from typing import ClassVar
+import json
+import hashlib
+from pathlib import Path
+from typing import ClassVar, Iterable, Iterator
+from bisect import bisect_right
+from itertools import accumulate, islice
+from functools import cached_property, reduce
 from dataclasses import dataclass
 
+import numpy as np
+
 
 # A very large number representing infinity
 INFTY = 1e20
 
 
-def range_intersection(rangeA: tuple, rangeB: tuple) -> tuple | bool:
-    rangeA_start, rangeA_end = rangeA
-    rangeB_start, rangeB_end = rangeB
-    assert rangeA_end >= rangeA_start and rangeB_end >= rangeB_start
-
-    if rangeA_end < rangeB_start or rangeB_end < rangeA_start:
-        return False
-
-    else:
-        return (max(rangeA_start, rangeB_start), min(rangeA_end, rangeB_end))
-
-
 class RangeMap:
     def __init__(self, mappings: list[tuple[int, int, int]], with_identity_maps: bool = False):
 
@@ -30,10 +27,60 @@ class RangeMap:
 
         if with_identity_maps:
             self.add_self_identity_mappings()
+        else:
+            self._build_lookup_arrays()
 
     def add_self_identity_mappings(self):
         # Added for part two
         self.mappings = self.fill_identity_mappings(self.mappings)
+        self._build_lookup_arrays()
+
+    def _build_lookup_arrays(self):
+        """Build the parallel arrays used to look up mappings by binary search.
+
+        Arrays are aligned with `self.mappings` (sorted by source start).
+        `max_src_ends[i]` is the largest source end among mappings 0..i, which
+        is non-decreasing even if mappings overlap; the first mapping whose
+        running max end is past `src` is the first one that may contain it.
+        """
+        self.src_starts = [src for (_dst, src, _length) in self.mappings]
+        self.src_ends = [src + length for (_dst, src, length) in self.mappings]
+        self.offsets = [dst - src for (dst, src, _length) in self.mappings]
+        self.max_src_ends = list(accumulate(self.src_ends, max))
+        self._np_lookup_arrays = None
+
+        self.segments = self._get_disjoint_segments()
+        self.segment_ends = [src_end for (_src_start, src_end, _offset) in self.segments]
+
+    @classmethod
+    def from_sorted_arrays(cls, mappings: np.ndarray, segments: np.ndarray) -> "RangeMap":
+        """Build a map from (n, 3) int64 arrays of its (dst, src, length)
+        mappings, already sorted by source start, and of its (src_start,
+        src_end, offset) `segments`.
+
+        Skips the sorting and the Python loops of `__init__`, for maps that
+        were already built once (e.g., loaded from an `AlmanacCache`).
+        """
+        range_map = cls.__new__(cls)
+
+        dsts, src_starts, lengths = np.array(mappings, dtype=np.int64).reshape(-1, 3).T
+        src_ends = src_starts + lengths
+        offsets = dsts - src_starts
+        max_src_ends = np.maximum.accumulate(src_ends) if len(src_ends) else src_ends
+
+        # Tuples are built from column lists, which are reused where possible
+        range_map.src_starts = src_starts.tolist()
+        range_map.mappings = list(zip(dsts.tolist(), range_map.src_starts, lengths.tolist()))
+        range_map.src_ends = src_ends.tolist()
+        range_map.offsets = offsets.tolist()
+        range_map.max_src_ends = max_src_ends.tolist()
+        range_map._np_lookup_arrays = (src_starts, max_src_ends, offsets)
+
+        segment_columns = np.asarray(segments, dtype=np.int64).reshape(-1, 3).T.tolist()
+        range_map.segments = list(zip(*segment_columns))
+        range_map.segment_ends = segment_columns[1]
+
+        return range_map
 
     @staticmethod
     def fill_identity_mappings(mappings, start_at: int = None, end_at: int = None) -> list:
@@ -66,17 +113,174 @@ class RangeMap:
 
     def get_dst(self, src: int) -> int:
 
-        # Iterate through the mappings (sorted by source start)
-        for dst_start, src_start, range_len in self.mappings:
+        # First mapping (sorted by source start) that may contain `src`
+        idx = bisect_right(self.max_src_ends, src)
 
-            # NOTE: mapping range is closed on the left and open on the right!
-            # range: [src_start, src_start + range_len[
-            if src_start <= src < src_start + range_len:
-                return src + (dst_start - src_start)
+        # NOTE: mapping range is closed on the left and open on the right!
+        # range: [src_start, src_start + range_len[
+        if idx < len(self.src_starts) and self.src_starts[idx] <= src:
+            return src + self.offsets[idx]
 
         # By default (if no particular mapping is provided), return self
         return src
 
+    def get_dst_many(self, srcs) -> np.ndarray:
+        """Vectorized `get_dst` over an array of sources."""
+        srcs = np.asarray(srcs, dtype=np.int64)
+        if not self.mappings:
+            return srcs.copy()
+
+        if self._np_lookup_arrays is None:
+            self._np_lookup_arrays = tuple(
+                np.array(arr, dtype=np.int64)
+                for arr in (self.src_starts, self.max_src_ends, self.offsets)
+            )
+        src_starts, max_src_ends, offsets = self._np_lookup_arrays
+
+        idx = np.minimum(np.searchsorted(max_src_ends, srcs, side="right"), len(src_starts) - 1)
+        is_mapped = (max_src_ends[idx] > srcs) & (src_starts[idx] <= srcs)
+        return srcs + np.where(is_mapped, offsets[idx], 0)
+
+    def get_offset(self, src: int) -> int:
+        """Return `get_dst(src) - src`."""
+        return self.get_dst(src) - src
+
+    def _get_disjoint_segments(self) -> list[tuple[int, int, int]]:
+        """Return the mappings as disjoint (src_start, src_end, offset) segments,
+        sorted by source start.
+
+        Where mappings overlap, `get_dst` uses the first one (sorted by source
+        start), so each segment only keeps the part not covered by previous
+        mappings.
+        """
+        segments = []
+        covered_until = None
+        for src_start, src_end, offset in zip(self.src_starts, self.src_ends, self.offsets):
+            if covered_until is not None:
+                src_start = max(src_start, covered_until)
+            if src_start < src_end:
+                segments.append((src_start, src_end, offset))
+            covered_until = src_end if covered_until is None else max(covered_until, src_end)
+
+        return segments
+
+    def compose(self, other: "RangeMap") -> "RangeMap":
+        """Return the map equivalent to applying `self` and then `other`.
+
+        The composed map is piecewise-linear with breakpoints at the breakpoints
+        of `self` and at the sources that `self` maps onto the breakpoints of
+        `other`; each piece is mapped with a single offset. Identity pieces are
+        dropped and adjacent pieces with the same offset are merged, so the
+        result is minimal.
+        """
+        self_segments = self.segments
+        other_breakpoints = sorted({
+            point
+            for src_start, src_end, _offset in other.segments
+            for point in (src_start, src_end)
+        })
+
+        breakpoints = {point for src_start, src_end, _ in self_segments for point in (src_start, src_end)}
+
+        # Sources mapped onto each breakpoint of `other`, by the segments of `self`...
+        for src_start, src_end, offset in self_segments:
+            first = bisect_right(other_breakpoints, src_start + offset - 1)
+            last = bisect_right(other_breakpoints, src_end + offset - 1)
+            breakpoints.update(point - offset for point in other_breakpoints[first:last])
+
+        # ... or by the identity, outside the segments of `self`
+        breakpoints.update(point for point in other_breakpoints if self.get_offset(point) == 0)
+
+        breakpoints = sorted(breakpoints)
+        mappings = []
+        for piece_start, piece_end in zip(breakpoints, breakpoints[1:]):
+            offset = self.get_offset(piece_start)
+            offset += other.get_offset(piece_start + offset)
+            if offset == 0:
+                continue
+
+            # Merge with the previous piece if contiguous and with the same offset
+            if mappings and mappings[-1][1] + mappings[-1][2] == piece_start \
+                    and mappings[-1][0] - mappings[-1][1] == offset:
+                prev_dst, prev_src, prev_length = mappings.pop()
+                mappings.append((prev_dst, prev_src, prev_length + piece_end - piece_start))
+            else:
+                mappings.append((piece_start + offset, piece_start, piece_end - piece_start))
+
+        return RangeMap(mappings=mappings)
+
+    def get_mappings_for_range(self, range_start: int, range_end: int) -> list[tuple[int, int, int]]:
+        """Return the (dst, src, length) pieces that map the range
+        `[range_start, range_end[`, identity pieces included.
+        """
+        return list(self.iter_mappings_for_range(range_start, range_end))
+
+    def iter_mappings_for_range(self, range_start: int, range_end: int) -> Iterator[tuple[int, int, int]]:
+        """Iterate over the pieces of `get_mappings_for_range`, in source order."""
+        curr_pos = range_start
+        for src_start, src_end, offset in islice(self.segments, bisect_right(self.segment_ends, range_start), None):
+            if src_start >= range_end:
+                break
+
+            if curr_pos < src_start:
+                yield (curr_pos, curr_pos, src_start - curr_pos)
+                curr_pos = src_start
+
+            piece_end = min(src_end, range_end)
+            yield (curr_pos + offset, curr_pos, piece_end - curr_pos)
+            curr_pos = piece_end
+
+        if curr_pos < range_end:
+            yield (curr_pos, curr_pos, range_end - curr_pos)
+
+    def iter_dst_ranges(self, ranges: Iterable[tuple[int, int]]) -> Iterator[tuple[int, int]]:
+        """Map each `[start, end[` range to the destination ranges it covers."""
+        for range_start, range_end in ranges:
+            for dst, _src, length in self.iter_mappings_for_range(range_start, range_end):
+                yield (dst, dst + length)
+
+    def get_min_dst(self, ranges: list[tuple[int, int]]) -> int | None:
+        """Return the lowest destination of any source in `ranges` (sorted and
+        disjoint, see `merge_ranges`), or None if `ranges` is empty.
+
+        Pieces of the map (identity pieces included) are checked by increasing
+        destination start, stopping as soon as no remaining piece can beat the
+        best destination found.
+        """
+        if not ranges:
+            return None
+
+        range_starts = [start for start, _end in ranges]
+        range_ends = [end for _start, end in ranges]
+
+        # Source pieces as (dst_start, src_start, src_end, offset)
+        pieces = [(src_start + offset, src_start, src_end, offset) for src_start, src_end, offset in self.segments]
+        identity_start = range_starts[0]
+        for src_start, src_end, _offset in self.segments + [(range_ends[-1], range_ends[-1], 0)]:
+            if identity_start < src_start:
+                pieces.append((identity_start, identity_start, src_start, 0))
+            identity_start = max(identity_start, src_end)
+
+        best_dst = None
+        for dst_start, src_start, src_end, offset in sorted(pieces):
+            if best_dst is not None and dst_start >= best_dst:
+                break
+
+            # Lowest source in `ranges` within this piece, if any
+            idx = bisect_right(range_ends, src_start)
+            if idx < len(ranges) and range_starts[idx] < src_end:
+                dst = max(src_start, range_starts[idx]) + offset
+                best_dst = dst if best_dst is None else min(best_dst, dst)
+
+        return best_dst
+
+    def to_json(self) -> str:
+        return json.dumps({"mappings": self.mappings})
+
+    @classmethod
+    def from_json(cls, json_str: str) -> "RangeMap":
+        return cls(mappings=[tuple(mapping) for mapping in json.loads(json_str)["mappings"]])
+
 
 @dataclass
 class Almanac:
@@ -110,6 +314,22 @@ class Almanac:
 
         return current_val
 
+    @cached_property
+    def seed_to_location(self) -> RangeMap:
+        """A single map from seed to location, composed once from all maps."""
+        return reduce(
+            RangeMap.compose,
+            (getattr(self, map_name) for map_name in self.map_sequence_names),
+        )
+
+    def get_seed_locations(self, seeds) -> np.ndarray:
+        """Vectorized `get_seed_location` over an array of seeds."""
+        current_vals = np.asarray(seeds, dtype=np.int64)
+        for map_name in self.map_sequence_names:
+            current_vals = getattr(self, map_name).get_dst_many(current_vals)
+
+        return current_vals
+
     def __post_init__(self):
         """Generate seed range needed for part two.
         """
@@ -124,75 +344,51 @@ class Almanac:
             mappings=[
                 mp
                 for seed_start, seed_end in self.seed_range
-                for mp in self._get_mappings_for_range(
-                    seed_start, seed_end,
-                    range_attr_name=self.map_sequence_names[0],
-                )
+                for mp in self.seed_to_location.iter_mappings_for_range(seed_start, seed_end)
             ]
         )
 
-    def _get_mappings_for_range(
-            self,
-            range_start: int,
-            range_end: int,
-            range_attr_name: str,
-        ) -> list[tuple]:
+    def iter_location_ranges(self, seed_ranges: Iterable[tuple[int, int]]) -> Iterator[tuple[int, int]]:
+        """Propagate `[start, end[` seed ranges through all maps, yielding the
+        sorted and disjoint location ranges they cover.
 
-        curr_range_map = getattr(self, range_attr_name)
-        mappings = list()
+        Ranges are merged after each map, so the number of ranges carried over
+        is bounded by the number of distinct breakpoints, instead of growing
+        multiplicatively with each map.
+        """
+        ranges = merge_ranges(seed_ranges)
+        for map_name in self.map_sequence_names:
+            ranges = merge_ranges(getattr(self, map_name).iter_dst_ranges(ranges))
 
-        for (_curr_dst, curr_src, curr_len) in curr_range_map.mappings:
+        yield from ranges
 
-            intersect = range_intersection(
-                (range_start, range_end),
-                (curr_src, curr_src + curr_len),
-            )
+    def get_min_location(self, seed_ranges: Iterable[tuple[int, int]]) -> int | None:
+        """Return the lowest location of any seed in `seed_ranges`.
 
-            # There's some intersection with the current mapping
-            if intersect is not False:
-                i_start, i_end = intersect
+        Same as the first location range of `iter_location_ranges`, but the
+        last map is searched by increasing location and stops as soon as the
+        minimum is proven (see `RangeMap.get_min_dst`).
+        """
+        ranges = merge_ranges(seed_ranges)
+        for map_name in self.map_sequence_names[:-1]:
+            ranges = merge_ranges(getattr(self, map_name).iter_dst_ranges(ranges))
 
-                mappings.append(
-                    (
-                        curr_range_map.get_dst(i_start),        # destination
-                        i_start,                                # source
-                        i_end - i_start,                        # range length
-                    )
-                )
+        return getattr(self, self.map_sequence_names[-1]).get_min_dst(ranges)
 
-                # Check early loop break
-                if i_end == range_end:
-                    break
 
-        # Add self mappings for whichever range portions were not mapped
-        mappings = RangeMap.fill_identity_mappings(
-            mappings,
-            start_at=range_start,
-            end_at=range_end,
-        )
+def merge_ranges(ranges: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Sort `[start, end[` ranges and merge those overlapping or adjacent."""
+    merged = []
+    for range_start, range_end in sorted(ranges):
+        if range_start >= range_end:
+            continue
 
-        # Base case
-        if range_attr_name == self.map_sequence_names[-1]:
-            return mappings
+        if merged and range_start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+        else:
+            merged.append((range_start, range_end))
 
-        # else: Recursive case
-        next_range_idx = self.map_sequence_names.index(range_attr_name) + 1
-        next_range_name = self.map_sequence_names[next_range_idx]
-
-        # TODO: yield instead of returning?
-        return [
-            (
-                new_dst,
-                src + new_src - dst,
-                new_length,
-            )
-            for (dst, src, length) in mappings
-            for (new_dst, new_src, new_length) in self._get_mappings_for_range(
-                range_start=dst,
-                range_end=dst + length,
-                range_attr_name=next_range_name,
-            )
-        ]
+    return merged
 
 
 def parse_input(input_lines: list[str]) -> Almanac:
@@ -220,7 +416,10 @@ def parse_input(input_lines: list[str]) -> Almanac:
             curr_name = name_match["name"].replace("-", "_")
             curr_mappings = list()
 
-            while (content_match := map_line_regex.match(input_lines[line_idx])):
+            while (
+                line_idx < len(input_lines)
+                and (content_match := map_line_regex.match(input_lines[line_idx]))
+            ):
                 curr_mappings.append(
                     tuple(map(int, (content_match["dst"], content_match["src"], content_match["len"])))
                 )
@@ -237,29 +436,146 @@ def parse_input(input_lines: list[str]) -> Almanac:
     )
 
 
-def solve_part_two(almanac: Almanac) -> int:
-    """Solve part two.
+class AlmanacCache:
+    """On-disk cache of parsed almanacs, keyed by a hash of the input.
+
+    Each almanac is stored as a flat int64 `.npy` array (seeds, then the
+    sorted mappings and disjoint segments of each map, then those of the
+    composed seed-to-location map), which is memory-mapped when loaded and
+    turned back into maps without sorting (see `RangeMap.from_sorted_arrays`).
+    When the cache grows past `max_bytes`, the least recently used entries
+    are evicted.
     """
 
-    # Compress all mappings into a single src->dst RangeMap for all seed ranges
-    seed_mappings = almanac.compress_seed_to_loc_maps()
+    # Bump when the layout of cached arrays changes
+    FORMAT_VERSION = 2
 
-    lowest_loc = None
-    for (dst, _, _) in seed_mappings.mappings:
+    # Names of cache entries (any version), as built by `get_path`
+    ENTRY_NAME_PATTERN = re.compile(r"[0-9a-f]{64}-v\d+\.npy")
 
-        if lowest_loc is None or lowest_loc > dst:
-            lowest_loc = dst
+    def __init__(self, cache_dir: str | os.PathLike = None, max_bytes: int = 256 * 2 ** 20):
+        self.cache_dir = Path(cache_dir or Path(__file__).parent / ".almanac_cache")
+        self.max_bytes = max_bytes
 
-    return lowest_loc
+    def get_path(self, input_lines: list[str]) -> Path:
+        digest = hashlib.sha256("\n".join(input_lines).encode()).hexdigest()
+        return self.cache_dir / f"{digest}-v{self.FORMAT_VERSION}.npy"
+
+    def get_or_parse(self, input_lines: list[str]) -> Almanac:
+        """Load the almanac for `input_lines` from the cache, or parse it and
+        cache it together with its composed seed-to-location map.
+        """
+        almanac = self.load(input_lines)
+        if almanac is None:
+            almanac = parse_input(input_lines)
+
+        # Compose once, so that later loads get the composed map for free
+        if "seed_to_location" not in almanac.__dict__:
+            almanac.seed_to_location
+            self.store(input_lines, almanac)
+
+        return almanac
+
+    def load(self, input_lines: list[str]) -> Almanac | None:
+        path = self.get_path(input_lines)
+        try:
+            values = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+        # Mark as recently used (unless evicted by another process meanwhile)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        def read_block(pos: int, num_rows: int, num_cols: int) -> tuple[np.ndarray, int]:
+            end = pos + num_rows * num_cols
+            return values[pos: end].reshape(num_rows, num_cols), end
+
+        num_seeds, pos = int(values[0]), 1
+        seeds, pos = read_block(pos, num_seeds, 1)
+        seeds = seeds.ravel().tolist()
+
+        range_maps = {}
+        for map_name in Almanac.map_sequence_names + ["seed_to_location"]:
+            num_mappings, pos = int(values[pos]), pos + 1
+            if num_mappings < 0:
+                continue
+            mappings, pos = read_block(pos, num_mappings, 3)
+            num_segments, pos = int(values[pos]), pos + 1
+            segments, pos = read_block(pos, num_segments, 3)
+            range_maps[map_name] = RangeMap.from_sorted_arrays(mappings, segments)
+
+        seed_to_location = range_maps.pop("seed_to_location", None)
+        almanac = Almanac(seeds=seeds, **range_maps)
+        if seed_to_location is not None:
+            almanac.seed_to_location = seed_to_location
+
+        return almanac
+
+    def store(self, input_lines: list[str], almanac: Almanac):
+        """Store `almanac` (and its composed map, if already computed)."""
+        blocks = [[len(almanac.seeds)], almanac.seeds]
+        for map_name in Almanac.map_sequence_names + ["seed_to_location"]:
+            if map_name == "seed_to_location" and map_name not in almanac.__dict__:
+                blocks.append([-1])
+                continue
+
+            range_map = getattr(almanac, map_name)
+            for rows in (range_map.mappings, range_map.segments):
+                blocks.append([len(rows)])
+                blocks.append([value for row in rows for value in row])
+
+        try:
+            values = np.array([value for block in blocks for value in block], dtype=np.int64)
+        except OverflowError:
+            return      # values don't fit in int64, don't cache
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.get_path(input_lines)
+        # Written to a file that `evict` won't match, then renamed atomically
+        tmp_path = path.with_name(f"{path.name}.tmp{os.getpid()}")
+        with open(tmp_path, "wb") as tmp_file:
+            np.save(tmp_file, values)
+        os.replace(tmp_path, path)
+
+        self.evict()
+
+    def evict(self):
+        """Delete the least recently used entries until the cache fits in
+        `max_bytes`, always keeping the most recent one. Other files in
+        `cache_dir` are left alone.
+        """
+        entries = []
+        for path in self.cache_dir.glob("*-v*.npy"):
+            if not self.ENTRY_NAME_PATTERN.fullmatch(path.name):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue    # Deleted by another process since the glob
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in entries[:-1]:
+            if total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+
+
+def solve_part_two(almanac: Almanac) -> int:
+    """Solve part two.
+    """
+    return almanac.get_min_location(almanac.seed_range)
 
 
 def solve_part_one(almanac: Almanac) -> int:
     """Solve part one: sum up the score of all cards.
     """
-    return min(
-        almanac.get_seed_location(seed)
-        for seed in almanac.seeds
-    )
+    return int(almanac.get_seed_locations(almanac.seeds).min())
 
 
 def main():
@@ -269,14 +585,13 @@ def main():
     # input_lines = sys.stdin.readlines()
 
     # > Or load from file
-    from pathlib import Path
     input_path = Path(__file__).parent / "input.txt"
     input_lines = [
         line.strip() for line in input_path.read_text().split("\n")
     ]
 
-    # Parse input
-    almanac = parse_input(input_lines)
+    # Parse input (or load it from the on-disk cache)
+    almanac = AlmanacCache().get_or_parse(input_lines)
 
     # Solve problem
     # output = solve_part_one(almanac)
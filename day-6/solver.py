@@ -5,8 +5,7 @@ import operator
 from dataclasses import dataclass
 from functools import reduce
 
-
-EPSILON = 1e-6
+import numpy as np
 
 
 @dataclass
@@ -21,53 +20,134 @@ class BoatRaces:
 def parse_input(input_lines: list[str]) -> BoatRaces:
     numbers_regex = re.compile(r"(?P<number>\d+)")
 
-    times = map(int, numbers_regex.findall(input_lines[0]))
-    distances = map(int, numbers_regex.findall(input_lines[1]))
+    times = [int(n) for n in numbers_regex.findall(input_lines[0])]
+    distances = [int(n) for n in numbers_regex.findall(input_lines[1])]
     return BoatRaces(times, distances)
 
 
-def solve_quadratic_equation(a: float, b: float, c: float) -> tuple[float, float]:
-    """Solve the quadratic equation `a*x**2 + b*x + c = 0`.
-    """
-    return (
-        (-b + (b ** 2 - 4 * a * c) ** (1/2)) / (2 * a),
-        (-b - (b ** 2 - 4 * a * c) ** (1/2)) / (2 * a),
-    )
-
-
-def num_integers_between(a: float, b: float) -> int:
-    """Return the number of integers between `a` and `b`.
-    """
-    if a > b:
-        a, b = b, a
-    return math.ceil(b - EPSILON) - math.ceil(a + EPSILON)
+# Batch inputs within these bounds are solved in int64/float64
+MAX_VECTORIZED_TIME = 2 ** 30
+MAX_VECTORIZED_RECORD = 2 ** 59
 
 
-def solve_part_one(boat_races: BoatRaces) -> int:
-    """Solve part one.
+def count_winning_holds(time: int, record: int) -> int:
+    """Count the button hold times `v` that beat the record distance.
 
-    Solve the equation:
+    Solves the inequality:
         v(t - v) > d,
     where v is the velocity and the amount of time the button was pressed,
     t is the total time the race lasts,
     and d is the current record distance.
 
     The standard form equality is:
-        -v**2 + t*v - d = 0.
+        -v**2 + t*v - d = 0,
+    whose solutions are v = (t -/+ sqrt(t**2 - 4d)) / 2. The winning hold
+    times are the integers strictly between them, symmetric around t/2. The
+    square root is computed exactly with `math.isqrt`, so any integers work.
+    """
+    discriminant = time * time - 4 * record
+    if discriminant <= 0:
+        return 0
+
+    # The lowest winning hold is within one of `(t - isqrt(t**2 - 4d)) // 2`
+    approx_lowest = (time - math.isqrt(discriminant)) // 2
+    lowest = next(
+        (v for v in range(approx_lowest - 1, approx_lowest + 3) if v * (time - v) > record),
+        None,
+    )
+    if lowest is None:
+        return 0
+
+    # Can't hold the button for a negative amount of time
+    lowest = max(lowest, 0)
+    return max(0, time - 2 * lowest + 1)
+
 
-    Solving the equality for `v` will yield two solutions, the solution to part
-    one is the number of integers between the two `v` solutions.
+def count_winning_holds_batch(times, records) -> np.ndarray:
+    """Vectorized `count_winning_holds` over arrays of times and records.
+
+    Races small enough for the computations to be exact in int64 (and for the
+    float64 square root to be off by at most one) are solved with NumPy; any
+    others fall back to exact Python integers, in which case the returned
+    array has dtype object.
     """
-    solutions_for_v = [
-        solve_quadratic_equation(a=-1, b=t, c=-d)
-        for t, d in boat_races.get_time_distance_pairs()
+    try:
+        times = np.asarray(times, dtype=np.int64)
+        records = np.asarray(records, dtype=np.int64)
+    except OverflowError:
+        times = np.asarray(times, dtype=object)
+        records = np.asarray(records, dtype=object)
+
+    is_vectorizable = (
+        (np.abs(times) < MAX_VECTORIZED_TIME) & (np.abs(records) < MAX_VECTORIZED_RECORD)
+    ).astype(bool)
+
+    counts = np.zeros(times.shape, dtype=np.int64 if is_vectorizable.all() else object)
+    counts[is_vectorizable] = _count_winning_holds_int64(
+        times[is_vectorizable].astype(np.int64),
+        records[is_vectorizable].astype(np.int64),
+    )
+    counts[~is_vectorizable] = [
+        count_winning_holds(int(t), int(d))
+        for t, d in zip(times[~is_vectorizable], records[~is_vectorizable])
     ]
+    return counts
+
+
+def _count_winning_holds_int64(times: np.ndarray, records: np.ndarray) -> np.ndarray:
+    """`count_winning_holds` for int64 arrays within the vectorized bounds."""
+    discriminant = times * times - 4 * records
+    positive_disc = np.maximum(discriminant, 0)
 
+    # Integer square root: float64 sqrt is off by at most one within the bounds
+    sqrt_disc = np.floor(np.sqrt(positive_disc.astype(np.float64))).astype(np.int64)
+    sqrt_disc = np.where(sqrt_disc * sqrt_disc > positive_disc, sqrt_disc - 1, sqrt_disc)
+    sqrt_disc = np.where((sqrt_disc + 1) * (sqrt_disc + 1) <= positive_disc, sqrt_disc + 1, sqrt_disc)
+
+    # Lowest winning hold among the candidates around the approximation
+    approx_lowest = (times - sqrt_disc) // 2
+    lowest = np.full(times.shape, -1, dtype=np.int64)
+    found = np.zeros(times.shape, dtype=bool)
+    for delta in range(2, -2, -1):
+        candidate = approx_lowest + delta
+        wins = candidate * (times - candidate) > records
+        lowest = np.where(wins, candidate, lowest)
+        found |= wins
+
+    lowest = np.maximum(lowest, 0)
+    return np.where(found & (discriminant > 0), np.maximum(times - 2 * lowest + 1, 0), 0)
+
+
+def concatenate_numbers(numbers: list[int]) -> int:
+    """Concatenate the digits of `numbers` into a single integer.
+
+    Splits the list in halves, so it's fast for many numbers, and doesn't
+    parse a (possibly very long) string of digits.
+    """
+    def concatenate(lo: int, hi: int) -> tuple[int, int]:
+        """Return the concatenation of numbers[lo:hi] and its power of ten."""
+        if hi - lo == 1:
+            return numbers[lo], 10 ** len(str(numbers[lo]))
+
+        mid = (lo + hi) // 2
+        left, left_pow = concatenate(lo, mid)
+        right, right_pow = concatenate(mid, hi)
+        return left * right_pow + right, left_pow * right_pow
+
+    return concatenate(0, len(numbers))[0] if numbers else 0
+
+
+def solve_part_one(boat_races: BoatRaces) -> int:
+    """Solve part one.
+
+    Multiply the number of ways to beat the record of each race (see
+    `count_winning_holds`).
+    """
     return reduce(
         operator.mul,
         [
-            num_integers_between(solutions[0], solutions[1])
-            for solutions in solutions_for_v
+            count_winning_holds(t, d)
+            for t, d in boat_races.get_time_distance_pairs()
         ],
     )
 
@@ -75,12 +155,10 @@ def solve_part_one(boat_races: BoatRaces) -> int:
 def solve_part_two(boat_races: BoatRaces) -> int:
     """Solve part two.
     """
-    time = int("".join(str(t) for t in boat_races.times))
-    dist = int("".join(str(t) for t in boat_races.distances))
+    time = concatenate_numbers(boat_races.times)
+    dist = concatenate_numbers(boat_races.distances)
 
-    return num_integers_between(
-        *solve_quadratic_equation(a=-1, b=time, c=-dist)
-    )
+    return count_winning_holds(time, dist)
 
 
 def main():
@@ -1,8 +1,16 @@
+import os
 import re
 import sys
 import math
+import heapq
 import operator
+import tempfile
+from pathlib import Path
 from functools import reduce
+from itertools import chain, count, islice
+from typing import Iterable, Iterator
+
+import numpy as np
 
 
 ### Regular card strength order
@@ -11,8 +19,27 @@ CARD_STRENGTH_ORDER_PART_ONE = "23456789TJQKA"
 ### Card strength order for part two where Js are the weakest
 CARD_STRENGTH_ORDER_PART_TWO = "J23456789TQKA"
 
-### Numeric base used for scoring cards
-NUMERIC_BASE = len(CARD_STRENGTH_ORDER_PART_ONE)
+### Number of cards in a hand
+HAND_SIZE = 5
+
+### Fixed-width (key, bid) records used to rank hands out of core, which limits
+### bids to 64 bits
+HAND_RECORD_DTYPE = np.dtype([("key", "<u4"), ("bid", "<u8")])
+
+### Rough memory used per hand while a run is being read and sorted: the line
+### and its parsed hand and bid, plus the hand's record
+BYTES_PER_PENDING_HAND = 256
+
+### Rough memory used per record buffered while merging runs: the record, and
+### its (key, bid) tuple
+BYTES_PER_BUFFERED_RECORD = 128
+
+### Fewest records buffered per run while merging: merging fewer runs at once,
+### in more passes, beats reading them in tiny blocks
+MIN_MERGE_BLOCK_SIZE = 256
+
+### Most runs merged at once, well below the usual limit of open files
+MAX_MERGE_FAN_IN = 128
 
 
 def parse_input(input_lines: list[str]) -> list[tuple[str, int]]:
@@ -24,33 +51,185 @@ def parse_input(input_lines: list[str]) -> list[tuple[str, int]]:
     ]
 
 
+class HandScorer:
+    """Scores hands into integer sort keys for a given card order and joker rule.
+
+    Holds no mutable state other than its lazily built strength table (which
+    is the same whoever builds it), so several scorers (e.g., one per part)
+    can be used concurrently from different threads or processes.
+
+    Parameters
+    ----------
+    card_order : str
+        All cards from weakest to strongest.
+    jokers : bool, optional
+        Whether to use J cards as jokers, by default False.
+    """
+
+    # Hand types from weakest to strongest, by their sorted card counts
+    HAND_TYPE_BY_COUNTS = {
+        (1, 1, 1, 1, 1): 0,     # High card
+        (2, 1, 1, 1): 1,        # One pair
+        (2, 2, 1): 2,           # Two pairs
+        (3, 1, 1): 3,           # Three of a kind
+        (3, 2): 4,              # Full house
+        (4, 1): 5,              # Four of a kind
+        (5,): 6,                # Five of a kind
+    }
+
+    JOKER = "J"
+
+    def __init__(self, card_order: str, jokers: bool = False):
+        self.card_order = card_order
+        self.jokers = jokers
+
+        # Translate each card into its digit in base len(card_order)
+        self.card_to_digit = str.maketrans(
+            card_order, "0123456789abcdefghijklmnopqrstuvwxyz"[:len(card_order)],
+        )
+        self.numeric_base = len(card_order)
+        self.cards = frozenset(card_order)
+
+        # Strength of every possible hand, built on first use
+        self._strength_table = None
+
+    def score_cards(self, hand: str) -> int:
+        """Score the cards in a hand, independently of hand type."""
+        # Translation keeps unknown cards, which `int` may take as digits
+        if not self.cards.issuperset(hand):
+            raise ValueError(f"Hand '{hand}' has cards not in '{self.card_order}'")
+        return int(hand.translate(self.card_to_digit), self.numeric_base)
+
+    def get_hand_type(self, hand: str) -> int:
+        """Get the type of the hand (0 for high card, up to 6 for five of a kind)."""
+        if self.jokers:
+            num_jokers = hand.count(self.JOKER)
+            hand = hand.replace(self.JOKER, "")
+        else:
+            num_jokers = 0
+
+        card_counts = sorted(map(hand.count, set(hand)), reverse=True) or [0]
+
+        # Jokers add to the most common card
+        card_counts[0] += num_jokers
+        return self.HAND_TYPE_BY_COUNTS[tuple(card_counts)]
+
+    def score_hand_strength(self, hand: str) -> int:
+        """Score the strength of a hand: its type, then its cards in order."""
+        return (
+            self.get_hand_type(hand) * self.numeric_base ** len(hand)
+            + self.score_cards(hand)
+        )
+
+    def get_strength_table(self, cache_dir: str | os.PathLike = None) -> np.ndarray:
+        """Get the strength of every possible hand of `HAND_SIZE` cards, indexed
+        by `score_cards(hand)` (the hand's cards in base `numeric_base`).
+
+        The table is built (vectorized) on first use, and kept for later calls.
+        If `cache_dir` is given, the table is also loaded from / saved to it.
+        """
+        if self._strength_table is not None:
+            return self._strength_table
+
+        cache_path = None
+        if cache_dir is not None:
+            jokers_str = "jokers" if self.jokers else "no-jokers"
+            cache_path = Path(cache_dir) / f"hand-strengths-{self.card_order}-{jokers_str}.npy"
+            if cache_path.exists():
+                self._strength_table = np.load(cache_path)
+                return self._strength_table
+
+        self._strength_table = self._build_strength_table()
+        if cache_path is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            np.save(cache_path, self._strength_table)
+
+        return self._strength_table
+
+    def _build_strength_table(self) -> np.ndarray:
+        num_hands = self.numeric_base ** HAND_SIZE
+        hand_indices = np.arange(num_hands, dtype=np.int64)
+
+        # Card digits of every hand, most significant first
+        powers = self.numeric_base ** np.arange(HAND_SIZE - 1, -1, -1)
+        digits = (hand_indices[:, None] // powers) % self.numeric_base
+
+        # Card counts of every hand, with jokers added to the most common card
+        card_counts = np.stack([(digits == card).sum(axis=1) for card in range(self.numeric_base)], axis=1)
+        num_jokers = 0
+        if self.jokers and self.JOKER in self.card_order:
+            joker_digit = self.card_order.index(self.JOKER)
+            num_jokers = card_counts[:, joker_digit].copy()
+            card_counts[:, joker_digit] = 0
+
+        card_counts = -np.sort(-card_counts, axis=1)
+        card_counts[:, 0] += num_jokers
+
+        # Hand type from the two largest counts
+        hand_type_by_top_counts = np.zeros((HAND_SIZE + 1, HAND_SIZE + 1), dtype=np.int64)
+        for counts, hand_type in self.HAND_TYPE_BY_COUNTS.items():
+            hand_type_by_top_counts[counts[0], (counts + (0,))[1]] = hand_type
+        hand_types = hand_type_by_top_counts[card_counts[:, 0], card_counts[:, 1]]
+
+        return (hand_types * num_hands + hand_indices).astype(np.uint32)
+
+    def score_hands(self, hands: list[str]) -> np.ndarray:
+        """Vectorized `score_hand_strength` of `HAND_SIZE`-card hands, by
+        looking up each hand in the strength table.
+        """
+        if not hands:
+            return np.zeros(0, dtype=np.uint32)
+
+        # Checked per hand, since hands of other sizes may add up to the same length
+        if set(map(len, hands)) != {HAND_SIZE}:
+            raise ValueError(f"All hands must have {HAND_SIZE} cards")
+
+        card_to_digit = np.full(256, -1, dtype=np.int64)
+        card_to_digit[np.frombuffer(self.card_order.encode(), dtype=np.uint8)] = np.arange(self.numeric_base)
+
+        # Non-ASCII cards span several bytes, so the size is checked again
+        digits = card_to_digit[np.frombuffer("".join(hands).encode(), dtype=np.uint8)]
+        if digits.size != len(hands) * HAND_SIZE or (digits < 0).any():
+            raise ValueError(f"All hands must have {HAND_SIZE} cards from '{self.card_order}'")
+
+        powers = self.numeric_base ** np.arange(HAND_SIZE - 1, -1, -1)
+        return self.get_strength_table()[digits.reshape(len(hands), HAND_SIZE) @ powers]
+
+
+HAND_SCORER_PART_ONE = HandScorer(CARD_STRENGTH_ORDER_PART_ONE)
+
+HAND_SCORER_PART_TWO = HandScorer(CARD_STRENGTH_ORDER_PART_TWO, jokers=True)
+
+
 def solve_part_one(problem_data) -> int:
     """Solve part one.
     """
-    global CARD_STRENGTH_ORDER
-    CARD_STRENGTH_ORDER = CARD_STRENGTH_ORDER_PART_ONE
-
-    return compute_sum_of_winnings(problem_data)
+    return compute_sum_of_winnings(problem_data, HAND_SCORER_PART_ONE)
 
 
 def solve_part_two(problem_data) -> int:
     """Solve part two.
     """
-    global CARD_STRENGTH_ORDER
-    CARD_STRENGTH_ORDER = CARD_STRENGTH_ORDER_PART_TWO
-
-    return compute_sum_of_winnings(problem_data, jokers=True)
+    return compute_sum_of_winnings(problem_data, HAND_SCORER_PART_TWO)
 
 
-def compute_sum_of_winnings(problem_data: list, jokers: bool = False) -> int:
+def compute_sum_of_winnings(
+        problem_data: list,
+        scorer: HandScorer,
+        use_strength_table: bool = False,
+    ) -> int:
     """Compute sum of winnings from the given problem data.
 
     Parameters
     ----------
     problem_data : list
         A list of tuples of the form (hand, bid).
-    jokers : bool, optional
-        Whether to use J cards as jokers, by default False.
+    scorer : HandScorer
+        The scorer used to rank hands.
+    use_strength_table : bool, optional
+        Whether to rank hands by looking them up in the scorer's table of all
+        hand strengths and sorting with NumPy, by default False. Pays off for
+        large numbers of hands, once the table is built.
 
     Returns
     -------
@@ -58,10 +237,16 @@ def compute_sum_of_winnings(problem_data: list, jokers: bool = False) -> int:
         A sum of hand_bid * hand_rank over all hands.
     """
 
+    if use_strength_table:
+        strengths = scorer.score_hands([hand for hand, _bid in problem_data])
+        bids = np.array([bid for _hand, bid in problem_data], dtype=np.int64)
+        sorted_bids = bids[np.argsort(strengths, kind="stable")]
+        return int(((1 + np.arange(len(sorted_bids))) * sorted_bids).sum())
+
     # Sort hands by strength
     sorted_hands = sorted(
         problem_data,
-        key=lambda line: score_hand_strength(line[0], jokers=jokers),
+        key=lambda line: scorer.score_hand_strength(line[0]),
         reverse=False,
     )
 
@@ -72,67 +257,174 @@ def compute_sum_of_winnings(problem_data: list, jokers: bool = False) -> int:
     )
 
 
-def score_cards(hand: str) -> int:
-    """Score the cards in a hand, independently of hand type.
+def compute_sum_of_winnings_external(
+        input_lines: Iterable[str],
+        scorer: HandScorer,
+        max_memory: int = 64 * 2**20,
+        tmp_dir: str | os.PathLike = None,
+    ) -> int:
+    """Compute sum of winnings of hands too many to fit in memory, with an
+    external merge sort.
+
+    Hands are read in runs, each of which is encoded into fixed-width (key,
+    bid) records, sorted, and spilled to a temporary file. The sorted runs
+    are then merged, a bounded number at a time (see `get_merge_fan_in`) into
+    longer runs until few enough are left, whose final merge streams each
+    hand's rank into the sum of winnings. Ties are broken by input order, as
+    in `compute_sum_of_winnings`, by only ever merging adjacent runs.
+
+    Parameters
+    ----------
+    input_lines : Iterable[str]
+        The input lines, e.g., an open input file.
+    scorer : HandScorer
+        The scorer used to rank hands.
+    max_memory : int, optional
+        The (approximate) number of bytes used at most for the hands being
+        sorted or merged, by default 64 MiB.
+    tmp_dir : str | os.PathLike, optional
+        The directory in which to spill sorted runs, by default the system's
+        temporary directory.
+
+    Returns
+    -------
+    sum_of_winnings : int
+        A sum of hand_bid * hand_rank over all hands.
+    """
+    run_size = max(1, max_memory // BYTES_PER_PENDING_HAND)
+    runs = iter_sorted_runs(input_lines, scorer, run_size)
+
+    first_run, is_last_run = next(runs, (None, True))
+    if first_run is None:
+        return 0
+
+    # No need to spill if all hands fit in a single run (bids are summed as
+    # Python ints, whose products can't overflow)
+    if is_last_run:
+        return sum(
+            (1 + rank) * bid
+            for rank, bid in enumerate(first_run["bid"].tolist())
+        )
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as run_dir:
+        run_indices = count()
+
+        # Spilled before the next run is read, to only hold one run at a time
+        run_paths = [spill_run(first_run, Path(run_dir) / f"run-{next(run_indices)}.bin")]
+        del first_run
+
+        for run, _is_last_run in runs:
+            run_paths.append(spill_run(run, Path(run_dir) / f"run-{next(run_indices)}.bin"))
+
+        # Split the memory budget among the runs being merged, and the output
+        fan_in = get_merge_fan_in(max_memory)
+        block_size = max(1, max_memory // ((fan_in + 1) * BYTES_PER_BUFFERED_RECORD))
+
+        # Merge groups of adjacent runs until they can all be merged at once
+        while len(run_paths) > fan_in:
+            run_paths = [
+                merge_run_files(
+                    run_paths[group_start:group_start + fan_in],
+                    Path(run_dir) / f"run-{next(run_indices)}.bin",
+                    block_size,
+                )
+                for group_start in range(0, len(run_paths), fan_in)
+            ]
+
+        return sum(
+            (1 + rank) * bid
+            for rank, (_key, bid) in enumerate(merge_runs(run_paths, block_size))
+        )
+
+
+def get_merge_fan_in(max_memory: int) -> int:
+    """Get the number of runs to merge at once within `max_memory` bytes: at
+    least 2, and at most `MAX_MERGE_FAN_IN` (each run is an open file).
+    """
+    fan_in = max_memory // (MIN_MERGE_BLOCK_SIZE * BYTES_PER_BUFFERED_RECORD) - 1
+    return min(max(fan_in, 2), MAX_MERGE_FAN_IN)
+
+
+def iter_sorted_runs(
+        input_lines: Iterable[str],
+        scorer: HandScorer,
+        run_size: int,
+    ) -> Iterator[tuple[np.ndarray, bool]]:
+    """Read hands in runs of up to `run_size`, and yield each run as a
+    `HAND_RECORD_DTYPE` array stably sorted by key, together with whether it
+    is the last run. Only the hand following each run is read ahead to tell,
+    not the whole next run.
     """
-    # Base case
-    if len(hand) == 1:
-        return CARD_STRENGTH_ORDER.index(hand)
-    
-    # Count the last card and sum the rest
-    return (
-        CARD_STRENGTH_ORDER.index(hand[-1])
-        + NUMERIC_BASE * score_cards(hand[:-1])
+    parsed_hands = (
+        hand_bid
+        for line in input_lines
+        for hand_bid in parse_input([line.strip()])
     )
 
+    next_hand = next(parsed_hands, None)
+    while next_hand is not None:
+        run_hands = list(islice(chain([next_hand], parsed_hands), run_size))
+        next_hand = next(parsed_hands, None)
 
-def score_hand_strength(hand: str, jokers: bool = False) -> int:
-    """Score the strength of a hand.
-    """
-    cards_in_hand = len(hand)
+        hands = [hand for hand, _bid in run_hands]
+        bids = [bid for _hand, bid in run_hands]
+        del run_hands
+        yield encode_sorted_run(hands, bids, scorer), next_hand is None
+
+        # Don't hold on to this run while reading the next one
+        del hands, bids
+
+
+def encode_sorted_run(hands: list[str], bids: list[int], scorer: HandScorer) -> np.ndarray:
+    run = np.empty(len(hands), dtype=HAND_RECORD_DTYPE)
+    run["key"] = scorer.score_hands(hands)
+    try:
+        run["bid"] = bids
+    except OverflowError:
+        raise ValueError("Bids must be less than 2**64 to be sorted out of core") from None
+    return run[np.argsort(run["key"], kind="stable")]
 
-    # Count card occurrences
-    card_counts = {card: hand.count(card) for card in hand}
 
-    # Add joker counts to the most often card
-    if jokers and "J" in card_counts and len(card_counts) > 1:
-        j_count = card_counts.pop("J", 0)
-        card_counts[max(card_counts, key=card_counts.get)] += j_count
+def spill_run(run: np.ndarray, run_path: Path) -> Path:
+    run.tofile(run_path)
+    return run_path
 
-    # Comparison key for card scores (ignoring hand type)
-    score = score_cards(hand)
 
-    # Find hand type
-    # 1. Five of a kind
-    if len(card_counts) == 1:
-        return NUMERIC_BASE ** (cards_in_hand + 7) + score
+def merge_runs(run_paths: list[Path], block_size: int) -> Iterator[tuple[int, int]]:
+    """Stream the (key, bid) records of the given sorted runs in key order,
+    with ties in the order of the runs.
+    """
+    return heapq.merge(
+        *[iter_run_records(run_path, block_size) for run_path in run_paths],
+        key=operator.itemgetter(0),
+    )
 
-    # 2. Four of a kind
-    elif len(card_counts) == 2 and 4 in card_counts.values():
-        return NUMERIC_BASE ** (cards_in_hand + 6) + score
 
-    # 3. Full house
-    elif len(card_counts) == 2 and 3 in card_counts.values():
-        return NUMERIC_BASE ** (cards_in_hand + 5) + score
+def merge_run_files(run_paths: list[Path], merged_run_path: Path, block_size: int) -> Path:
+    """Merge the given sorted runs into a single run, writing `block_size`
+    records at a time, and delete them.
+    """
+    if len(run_paths) == 1:
+        return run_paths[0]
 
-    # 4. Three of a kind
-    elif 3 in card_counts.values():
-        return NUMERIC_BASE ** (cards_in_hand + 4) + score
+    merged_records = merge_runs(run_paths, block_size)
+    with open(merged_run_path, "wb") as merged_run_file:
+        while block := list(islice(merged_records, block_size)):
+            np.array(block, dtype=HAND_RECORD_DTYPE).tofile(merged_run_file)
 
-    # 5. Two pairs
-    elif len(card_counts) == 3 and 2 in card_counts.values():
-        return NUMERIC_BASE ** (cards_in_hand + 3) + score
+    for run_path in run_paths:
+        run_path.unlink()
 
-    # 6. One pair
-    elif len(card_counts) == 4 and 2 in card_counts.values():
-        return NUMERIC_BASE ** (cards_in_hand + 2) + score
+    return merged_run_path
 
-    # 7. High card
-    elif len(card_counts) == 5:
-        return score
 
-    else:
-        raise ValueError("Unknown hand type")
+def iter_run_records(run_path: Path, block_size: int) -> Iterator[tuple[int, int]]:
+    """Stream the (key, bid) records of a spilled run, reading `block_size`
+    records at a time.
+    """
+    with open(run_path, "rb") as run_file:
+        while len(block := np.fromfile(run_file, dtype=HAND_RECORD_DTYPE, count=block_size)):
+            yield from zip(block["key"].tolist(), block["bid"].tolist())
 
 
 def main():
@@ -155,6 +447,10 @@ def main():
     # output = solve_part_one(problem_data)
     output = solve_part_two(problem_data)
 
+    # # > Or rank hands out of core, streaming them from the file
+    # with input_path.open() as input_file:
+    #     output = compute_sum_of_winnings_external(input_file, HAND_SCORER_PART_TWO)
+
     # Write to stdout
     print(output, file=sys.stdout)
 
@@ -1,7 +1,12 @@
 import re
 import sys
+import math
 from typing import Callable
-from functools import reduce
+from functools import cached_property
+from itertools import chain, cycle
+from dataclasses import dataclass, field
+
+import numpy as np
 
 
 def parse_input(input_lines: list[str]) -> tuple[str, dict[str, tuple[str, str]]]:
@@ -19,24 +24,392 @@ def parse_input(input_lines: list[str]) -> tuple[str, dict[str, tuple[str, str]]
     return left_right_instructions, graph
 
 
-def solve_part_one(problem_data, src_node, dst_node: str | Callable) -> int:
-    """Solve part one.
+@dataclass
+class WalkCycle:
+    """Times at which a walk is at a destination node, given by the cycle over
+    (node, instruction index) states it eventually enters.
+
+    The walk is at a destination at each time in `dst_times_in_prefix` (all
+    before `cycle_start`), and at each time `t + k * cycle_length` for every
+    `t` in `dst_times_in_cycle` (all in `[cycle_start, cycle_start +
+    cycle_length)`) and `k >= 0`.
+    """
+    dst_times_in_prefix: list[int]
+    dst_times_in_cycle: list[int]
+    cycle_start: int
+    cycle_length: int
+
+    def is_at_dst(self, time: int) -> bool:
+        if time < self.cycle_start:
+            return time in self.dst_times_in_prefix
+        return self.cycle_start + (time - self.cycle_start) % self.cycle_length in self.dst_times_in_cycle
+
+
+@dataclass
+class CompiledNetwork:
+    """Network with nodes interned to dense integer ids, so that walks only
+    touch integers.
+
+    Following instruction `instr` (0 for L, 1 for R) from node `node_id`
+    leads to node `successors[node_id, instr]`.
+    """
+    node_names: list[str]           # name of each node id
+    node_ids: dict[str, int]        # id of each node name
+    successors: np.ndarray          # int32, (num_nodes, 2) left and right node ids
+    instructions: bytes             # 0 for L, 1 for R
+
+    # Destination node ids by destination, see `get_dst_ids`
+    _dst_ids: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_names)
+
+    @cached_property
+    def successor_list(self) -> list[int]:
+        """`successors` flattened to a plain list (left and right of node i at
+        2i and 2i + 1), which is faster than NumPy to index one item at a
+        time. Built once, and shared by all walks.
+        """
+        return self.successors.ravel().tolist()
+
+    @property
+    def left(self) -> np.ndarray:
+        return self.successors[:, 0]
+
+    @property
+    def right(self) -> np.ndarray:
+        return self.successors[:, 1]
+
+    def get_is_dst(self, dst_node: str | Callable) -> np.ndarray:
+        """Get whether each node id is a destination, given either the name of
+        the single destination node, or a predicate on node names.
+        """
+        if isinstance(dst_node, str):
+            is_dst = np.zeros(self.num_nodes, dtype=bool)
+            if dst_node in self.node_ids:
+                is_dst[self.node_ids[dst_node]] = True
+            return is_dst
+
+        return np.fromiter(map(dst_node, self.node_names), dtype=bool, count=self.num_nodes)
+
+    def get_dst_ids(self, dst_node: str | Callable) -> frozenset[int]:
+        """Get the ids of the destination nodes, given as in `get_is_dst`.
+        Built once per destination, and shared by all walks to it.
+        """
+        if dst_node not in self._dst_ids:
+            self._dst_ids[dst_node] = frozenset(np.flatnonzero(self.get_is_dst(dst_node)).tolist())
+        return self._dst_ids[dst_node]
+
+    def count_steps(self, src_id: int, dst_ids: frozenset[int]) -> int:
+        """Count the steps needed to walk from node `src_id` to any of the
+        destination nodes `dst_ids` (see `get_dst_ids`), starting from the
+        first instruction.
+        """
+        successors = self.successor_list
+
+        node_id = src_id
+        for num_steps, instr in enumerate(cycle(self.instructions)):
+            if node_id in dst_ids:
+                return num_steps
+            node_id = successors[2 * node_id + instr]
+
+
+class NextDstMemo:
+    """Memo of the distance from each (node, instruction index) state to the
+    next state at a destination node, and of that state, shared by all walks
+    and queries on a network.
+
+    States are filled on first visit, with every state along the way, so the
+    total work is bounded by the number of distinct states however many walks
+    go through them. States are encoded as `node_id * L + instr_idx`, with L
+    the number of instructions.
+
+    Parameters
+    ----------
+    network : CompiledNetwork
+        The network to walk on.
+    is_dst : np.ndarray
+        Whether each node id is a destination (see
+        `CompiledNetwork.get_is_dst`).
     """
+
+    # Memo values of states from which no destination is reached, and of
+    # states on the walk being filled (other values are >= 0)
+    NO_DST = -1
+    ON_PATH = -2
+
+    def __init__(self, network: CompiledNetwork, is_dst: np.ndarray):
+        self.network = network
+        self.num_instructions = len(network.instructions)
+        self.num_states = network.num_nodes * self.num_instructions
+
+        self._is_dst = is_dst.tolist()
+
+        # Next destination of each visited state, packed into a single int as
+        # `distance * num_states + dst_state`
+        self._next_dst = dict()
+
+    def get_next_dst(self, state: int) -> tuple[int, int] | None:
+        """Get the number of steps (at least one) from `state` to the next
+        state at a destination node, and that state, or None if none.
+        """
+        if state not in self._next_dst:
+            self._fill(state)
+
+        if (next_dst := self._next_dst[state]) == self.NO_DST:
+            return None
+        return divmod(next_dst, self.num_states)
+
+    def _fill(self, state: int):
+        successors, is_dst, instructions = self.network.successor_list, self._is_dst, self.network.instructions
+        next_dsts = self._next_dst
+
+        # Walk until a destination, a memoized state, or a state of this walk
+        # (marked as on the path until its next destination is known)
+        path = [state]
+        next_dsts[state] = self.ON_PATH
+        node_id, instr_idx = divmod(state, self.num_instructions)
+        while True:
+            node_id = successors[2 * node_id + instructions[instr_idx]]
+            instr_idx = (instr_idx + 1) % self.num_instructions
+            state = node_id * self.num_instructions + instr_idx
+
+            # Next destination of the state the walk stops at
+            if is_dst[node_id]:
+                next_dst = state
+                break
+            if state in next_dsts:
+                next_dst = next_dsts[state]
+                # Back to a state of this walk: it loops without destinations
+                if next_dst == self.ON_PATH:
+                    next_dst = self.NO_DST
+                break
+
+            path.append(state)
+            next_dsts[state] = self.ON_PATH
+
+        # All states along the way share the same next destination, each one
+        # step further than the next
+        if next_dst == self.NO_DST:
+            next_dsts.update(dict.fromkeys(path, self.NO_DST))
+        else:
+            last_next_dst = next_dst + self.num_states
+            next_dsts.update(zip(
+                reversed(path),
+                range(last_next_dst, last_next_dst + len(path) * self.num_states, self.num_states),
+            ))
+
+    def find_cycle(self, src_id: int) -> WalkCycle:
+        """Jump from destination to destination of the walk from node
+        `src_id`, until a destination state repeats (or no destination is
+        left), recording the times at which destination nodes are reached.
+        """
+        state = src_id * self.num_instructions
+        time = 0
+
+        dst_visit_times = dict()
+        if self._is_dst[src_id]:
+            dst_visit_times[state] = time
+
+        while (next_dst := self.get_next_dst(state)) is not None:
+            distance, state = next_dst
+            time += distance
+            if state in dst_visit_times:
+                break
+            dst_visit_times[state] = time
+
+        # No destination is ever reached again
+        else:
+            return WalkCycle(
+                dst_times_in_prefix=list(dst_visit_times.values()),
+                dst_times_in_cycle=[],
+                cycle_start=time + 1,
+                cycle_length=1,
+            )
+
+        cycle_start = dst_visit_times[state]
+        return WalkCycle(
+            dst_times_in_prefix=[dst_time for dst_time in dst_visit_times.values() if dst_time < cycle_start],
+            dst_times_in_cycle=[dst_time for dst_time in dst_visit_times.values() if dst_time >= cycle_start],
+            cycle_start=cycle_start,
+            cycle_length=time - cycle_start,
+        )
+
+
+class PassJumpTable:
+    """Doubling tables over the functional graph of full passes of the
+    instruction string, answering where a walk is after `k` steps, and when it
+    first reaches a destination node within `k` steps, in O(log(k) + L) time,
+    with L the number of instructions.
+
+    Level `j` of the tables gives, for each node, the node reached after
+    `2**j` passes from it (starting from the first instruction), and the
+    first step within those passes at which the walk is at a destination
+    node (-1 if none). Levels are built on demand, up to the largest `k`
+    queried so far. Step counts are int64, so `k` must be between 0 and
+    `MAX_NUM_STEPS`.
+
+    Parameters
+    ----------
+    network : CompiledNetwork
+        The network to walk on.
+    is_dst : np.ndarray
+        Whether each node id is a destination (see
+        `CompiledNetwork.get_is_dst`).
+    """
+
+    # Largest step count that can be queried
+    MAX_NUM_STEPS = np.iinfo(np.int64).max
+
+    def __init__(self, network: CompiledNetwork, is_dst: np.ndarray):
+        self.network = network
+        self.is_dst = is_dst
+        self.pass_length = len(network.instructions)
+
+        # Single pass, one step at a time for all nodes at once
+        positions = np.arange(network.num_nodes, dtype=np.int32)
+        first_dst_steps = np.full(network.num_nodes, -1, dtype=np.int64)
+        for step, instr in enumerate(network.instructions):
+            first_dst_steps[(first_dst_steps < 0) & is_dst[positions]] = step
+            positions = network.successors[positions, instr]
+
+        self.pass_jumps = [positions]
+        self.first_dst_steps = [first_dst_steps]
+
+    def _ensure_levels(self, num_passes: int):
+        """Build levels until `num_passes` fits in their binary decomposition."""
+        while len(self.pass_jumps) < num_passes.bit_length():
+            jumps, first_dst_steps = self.pass_jumps[-1], self.first_dst_steps[-1]
+            num_steps = self.pass_length << (len(self.pass_jumps) - 1)
+
+            # A destination in the first half, or else in the second half
+            second_half_first_dst_steps = first_dst_steps[jumps]
+            self.first_dst_steps.append(np.where(
+                first_dst_steps >= 0,
+                first_dst_steps,
+                np.where(second_half_first_dst_steps >= 0, second_half_first_dst_steps + num_steps, -1),
+            ))
+            self.pass_jumps.append(jumps[jumps])
+
+    def get_position_after(self, src_id: int, num_steps: int) -> int:
+        """Get the node id reached after `num_steps` steps from node `src_id`."""
+        return int(self.get_positions_after([src_id], [num_steps])[0])
+
+    def find_first_dst_within(self, src_id: int, num_steps: int) -> int | None:
+        """Get the first step, up to `num_steps` included, at which the walk
+        from node `src_id` is at a destination node, or None if none.
+        """
+        first_dst_step = int(self.find_first_dsts_within([src_id], [num_steps])[0])
+        return None if first_dst_step < 0 else first_dst_step
+
+    def get_positions_after(self, src_ids, num_steps) -> np.ndarray:
+        """Batch version of `get_position_after`, for arrays of node ids and
+        step counts (which are broadcast together).
+        """
+        positions, _ = self._walk_batch(src_ids, num_steps, stop_at_dst=False)
+        return positions
+
+    def find_first_dsts_within(self, src_ids, num_steps) -> np.ndarray:
+        """Batch version of `find_first_dst_within`, for arrays of node ids
+        and step counts (which are broadcast together), with -1 for walks
+        that don't reach any destination node.
+        """
+        _, first_dst_steps = self._walk_batch(src_ids, num_steps, stop_at_dst=True)
+        return first_dst_steps
+
+    def _walk_batch(self, src_ids, num_steps, stop_at_dst: bool) -> tuple[np.ndarray, np.ndarray]:
+        # Checked before the cast to int64, which would overflow or wrap around
+        num_steps = np.asarray(num_steps)
+        if num_steps.size and num_steps.min() < 0:
+            raise ValueError("Step counts must be non-negative")
+        if num_steps.size and num_steps.max() > self.MAX_NUM_STEPS:
+            raise ValueError(f"Step counts must be at most {self.MAX_NUM_STEPS}")
+
+        src_ids, num_steps = np.broadcast_arrays(np.asarray(src_ids, dtype=np.int32), num_steps.astype(np.int64))
+        num_passes, num_remaining_steps = np.divmod(num_steps.ravel(), self.pass_length)
+
+        positions = src_ids.ravel().copy()
+        first_dst_steps = np.full(len(positions), -1, dtype=np.int64)
+        steps_taken = np.zeros(len(positions), dtype=np.int64)
+        if len(positions) == 0:
+            return positions.reshape(src_ids.shape), first_dst_steps.reshape(src_ids.shape)
+
+        # Full passes, in chunks of 2**level passes, largest first
+        self._ensure_levels(int(num_passes.max()))
+        for level in reversed(range(len(self.pass_jumps))):
+            walking = ((num_passes >> level) & 1).astype(bool)
+            if stop_at_dst:
+                walking &= first_dst_steps < 0
+                chunk_first_dst_steps = self.first_dst_steps[level][positions]
+                reached_dst = walking & (chunk_first_dst_steps >= 0)
+                first_dst_steps[reached_dst] = steps_taken[reached_dst] + chunk_first_dst_steps[reached_dst]
+                walking &= ~reached_dst
+
+            positions[walking] = self.pass_jumps[level][positions[walking]]
+            steps_taken[walking] += self.pass_length << level
+
+        # Remaining steps of the last partial pass, one at a time
+        for step, instr in enumerate(self.network.instructions):
+            if stop_at_dst:
+                reached_dst = (first_dst_steps < 0) & (step <= num_remaining_steps) & self.is_dst[positions]
+                first_dst_steps[reached_dst] = steps_taken[reached_dst] + step
+
+            walking = step < num_remaining_steps
+            if stop_at_dst:
+                walking &= first_dst_steps < 0
+            if not walking.any():
+                break
+            positions[walking] = self.network.successors[positions[walking], instr]
+
+        # The walk may reach its first destination on its very last step
+        if stop_at_dst:
+            reached_dst = (first_dst_steps < 0) & self.is_dst[positions]
+            first_dst_steps[reached_dst] = steps_taken[reached_dst] + num_remaining_steps[reached_dst]
+
+        return positions.reshape(src_ids.shape), first_dst_steps.reshape(src_ids.shape)
+
+
+def compile_network(problem_data) -> CompiledNetwork:
+    """Intern the nodes of the parsed network to dense integer ids, and decode
+    its instructions to 0 (L) / 1 (R).
+
+    An already compiled network is returned as is, so callers can compile
+    once and pass the compiled network to every query.
+    """
+    if isinstance(problem_data, CompiledNetwork):
+        return problem_data
+
     instructions, graph = problem_data
 
-    curr_node = src_node
-    num_steps = 0
-    curr_instr_idx = 0
+    node_names = list(graph)
+    node_ids = dict(zip(node_names, range(len(node_names))))
 
-    reached_dst_node = lambda node: node == dst_node if isinstance(dst_node, str) else dst_node(node)
+    try:
+        successors = np.fromiter(
+            map(node_ids.__getitem__, chain.from_iterable(graph.values())),
+            dtype=np.int32,
+            count=2 * len(node_names),
+        ).reshape(-1, 2)
+    except KeyError as error:
+        raise ValueError(f"Node without outgoing edges: {error}") from None
+
+    return CompiledNetwork(
+        node_names=node_names,
+        node_ids=node_ids,
+        successors=successors,
+        instructions=bytes(instr != "L" for instr in instructions),
+    )
 
-    while not reached_dst_node(curr_node):
-        instr = instructions[curr_instr_idx]
-        curr_node = graph[curr_node][0 if instr == "L" else 1]
-        num_steps += 1
-        curr_instr_idx = (curr_instr_idx + 1) % len(instructions)
-    
-    return num_steps
+
+def solve_part_one(problem_data, src_node: str = "AAA", dst_node: str | Callable = "ZZZ") -> int:
+    """Solve part one.
+
+    `problem_data` is either the parsed input or a network compiled from it
+    (see `compile_network`), to be reused across calls.
+    """
+    network = compile_network(problem_data)
+    return network.count_steps(network.node_ids[src_node], network.get_dst_ids(dst_node))
 
 
 def solve_part_two(problem_data) -> int:
@@ -47,24 +420,82 @@ def solve_part_two(problem_data) -> int:
     def is_dst_node(node: str):
         return node[-1] == "Z"
     
-    instructions, graph = problem_data
+    network = compile_network(problem_data)
+    next_dst_memo = NextDstMemo(network, network.get_is_dst(is_dst_node))
+
+    # Get the times at which each walk from a node ending in A is at a node
+    # ending in Z, sharing the walks of merging paths
+    walk_cycles = [
+        next_dst_memo.find_cycle(node_id)
+        for node, node_id in network.node_ids.items() if is_src_node(node)
+    ]
+
+    return find_first_common_dst_time(walk_cycles)
 
-    # Get number of steps to reach a node ending in Z for each node ending in A
-    num_steps_to_dst_node = {
-        node: solve_part_one(problem_data, src_node=node, dst_node=is_dst_node)
-        for node in graph.keys() if is_src_node(node)
-    }
 
-    # Get least common multiple between all step counts
-    def gcd(a, b):
-        while b:
-            a, b = b, a % b
-        return a
+def find_first_common_dst_time(walk_cycles: list[WalkCycle]) -> int:
+    """Find the first time at which all walks are at a destination node at
+    once, on arbitrary networks (any number of destinations per cycle, and
+    any cycle start).
 
-    def lcm(a, b):
-        return a * b // gcd(a, b)
+    Raises
+    ------
+    ValueError
+        If the walks are never all at a destination node at once.
+    """
+    if not walk_cycles:
+        return 0
+
+    # Before the last cycle start, the walk with the longest prefix is still
+    # in it, so it can only be at one of its prefix destination times
+    longest_prefix_walk = max(walk_cycles, key=lambda walk_cycle: walk_cycle.cycle_start)
+    for time in longest_prefix_walk.dst_times_in_prefix:
+        if all(walk_cycle.is_at_dst(time) for walk_cycle in walk_cycles):
+            return time
+
+    # From then on, all walks are in their cycles: combine the congruences
+    # time = dst_time (mod cycle_length) allowed by each walk
+    residues, modulus = {0}, 1
+    for walk_cycle in walk_cycles:
+        residues, modulus = combine_congruence_sets(
+            residues, modulus,
+            {dst_time % walk_cycle.cycle_length for dst_time in walk_cycle.dst_times_in_cycle},
+            walk_cycle.cycle_length,
+        )
 
-    return reduce(lcm, num_steps_to_dst_node.values())
+    if not residues:
+        raise ValueError("Walks are never all at a destination node at once")
+
+    # Get the first time, from the last cycle start, matching any residue
+    min_time = longest_prefix_walk.cycle_start
+    return min(min_time + (residue - min_time) % modulus for residue in residues)
+
+
+def combine_congruence_sets(
+        residues_1: set[int], modulus_1: int,
+        residues_2: set[int], modulus_2: int,
+    ) -> tuple[set[int], int]:
+    """Combine `x = r1 (mod modulus_1)` for any r1 in `residues_1` and `x = r2
+    (mod modulus_2)` for any r2 in `residues_2` into `x = r (mod lcm)` for any
+    r in the returned residues, with the generalized Chinese remainder theorem
+    (moduli need not be coprime).
+    """
+    gcd = math.gcd(modulus_1, modulus_2)
+    lcm = modulus_1 // gcd * modulus_2
+
+    # x = r1 + k * modulus_1 with k * (modulus_1 / gcd) = (r2 - r1) / gcd (mod modulus_2 / gcd)
+    reduced_modulus_2 = modulus_2 // gcd
+    inverse = pow(modulus_1 // gcd, -1, reduced_modulus_2)
+
+    combined_residues = set()
+    for residue_1 in residues_1:
+        for residue_2 in residues_2:
+            diff = residue_2 - residue_1
+            if diff % gcd == 0:
+                k = (diff // gcd * inverse) % reduced_modulus_2
+                combined_residues.add((residue_1 + k * modulus_1) % lcm)
+
+    return combined_residues, lcm
 
 
 def main():
@@ -87,6 +518,11 @@ def main():
     # output = solve_part_one(problem_data, src_node="AAA", dst_node="ZZZ")
     output = solve_part_two(problem_data)
 
+    # # > Or find where a walk from AAA is after a trillion steps
+    # network = compile_network(problem_data)
+    # jump_table = PassJumpTable(network, network.get_is_dst("ZZZ"))
+    # output = network.node_names[jump_table.get_position_after(network.node_ids["AAA"], 10**12)]
+
     # Write to stdout
     print(output, file=sys.stdout)
 
@@ -23,7 +23,7 @@ def solve_part_one(problem_data) -> int:
 def extrapolate_value_from_history(history: list[int]) -> int:
     """Extrapolate FUTURE value from history (PART ONE)."""
 
-    solution_lines = [history]
+    solution_lines = [list(history)]
 
     # Construct pyramid lines
     while True:
@@ -45,7 +45,7 @@ def extrapolate_value_from_history(history: list[int]) -> int:
 def extrapolate_past_value_from_history(history: list[int]) -> int:
     """Extrapolate PAST value from history (PART TWO)."""
 
-    solution_lines = [history]
+    solution_lines = [list(history)]
 
     # Construct pyramid lines -- same as part one
     while True: